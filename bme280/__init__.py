@@ -29,39 +29,392 @@ Raspberry Pi BME280 Driver.
 
 __version__ = "0.2.4"
 
+import collections
 import datetime
+import errno
+import struct
+import threading
 import time
 import uuid
+import zlib
 
 from bme280.reader import reader
 import bme280.const as oversampling
 import pytz
 
 # Oversampling modes
+oversampling.skip = 0
 oversampling.x1 = 1
 oversampling.x2 = 2
 oversampling.x4 = 3
 oversampling.x8 = 4
 oversampling.x16 = 5
 
+# IIR filter coefficients
+filter_coefficient = type(oversampling)()
+filter_coefficient.off = 0
+filter_coefficient.x2 = 1
+filter_coefficient.x4 = 2
+filter_coefficient.x8 = 3
+filter_coefficient.x16 = 4
+
+# Standby times between measurements in normal mode
+standby_time = type(oversampling)()
+standby_time.ms_0_5 = 0
+standby_time.ms_62_5 = 1
+standby_time.ms_125 = 2
+standby_time.ms_250 = 3
+standby_time.ms_500 = 4
+standby_time.ms_1000 = 5
+standby_time.ms_10 = 6
+standby_time.ms_20 = 7
+
+# Standby time in seconds, indexed by the above, see table 27 of the datasheet
+STANDBY_TIMES = (0.0005, 0.0625, 0.125, 0.25, 0.5, 1.0, 0.010, 0.020)
+
+# Sensor modes
+SLEEP_MODE = 0
+FORCED_MODE = 1
+NORMAL_MODE = 3
+
 DEFAULT_PORT = 0x76
 
+# Value of the id register (0xD0)
+CHIP_ID = 0x60
 
-class uncompensated_readings(object):
 
-    def __init__(self, block):
+class uncompensated_readings(object):
+    """
+    The raw ADC values decoded from a block of data registers. Usually this
+    is all eight registers from 0xF7, but partial blocks are also understood:
+    starting at 0xF7 without the humidity registers, or starting at 0xFA
+    (temperature) with or without humidity. Values missing from the block
+    are ``None``.
+    """
+    def __init__(self, block, register=0xF7):
         self._block = block
-        self.pressure = (block[0] << 16 | block[1] << 8 | block[2]) >> 4
-        self.temperature = (block[3] << 16 | block[4] << 8 | block[5]) >> 4
-        self.humidity = block[6] << 8 | block[7]
+        if register == 0xF7:
+            self.pressure = (block[0] << 16 | block[1] << 8 | block[2]) >> 4
+            t = 3
+        else:
+            self.pressure = None
+            t = 0
+        self.temperature = (block[t] << 16 | block[t + 1] << 8 | block[t + 2]) >> 4
+        self.humidity = block[t + 3] << 8 | block[t + 4] if len(block) > t + 3 else None
+
+    @classmethod
+    def from_buffer(cls, buffer, offset=0):
+        """
+        Decodes all eight data registers (0xF7-0xFE) directly from
+        ``bytes``, a ``bytearray``, ``memoryview`` or any other object
+        supporting the buffer protocol, starting at ``offset``, without
+        copying them.
+        """
+        self = cls.__new__(cls)
+        p_msb, p_xlsb, t_msb, t_xlsb, self.humidity = _data_block.unpack_from(buffer, offset)
+        self.pressure = p_msb << 4 | p_xlsb >> 4
+        self.temperature = t_msb << 4 | t_xlsb >> 4
+        self._block = None
+        return self
+
+    def __repr__(self):
+        block = self._block
+        if block is None:
+            block = _data_block.pack(self.pressure >> 4, (self.pressure & 0x0F) << 4,
+                                     self.temperature >> 4, (self.temperature & 0x0F) << 4,
+                                     self.humidity)
+        return "uncompensated_reading(temp={0}, pressure={1}, humidity={2}, block={3})".format(
+            _format(self.temperature, "0x{0:08X}"), _format(self.pressure, "0x{0:08X}"),
+            _format(self.humidity, "0x{0:08X}"), ":".join("{0:02X}".format(c) for c in block))
+
+
+# The data registers 0xF7-0xFE: big-endian press_msb/lsb, press_xlsb,
+# temp_msb/lsb, temp_xlsb and hum_msb/lsb
+_data_block = struct.Struct(">HBHBH")
+
+
+def decode_blocks(buffer, offset=0, count=None):
+    """
+    Decodes ``count`` (by default, as many as there are) consecutive 8-byte
+    blocks of data registers from a buffer, starting at ``offset``, in a
+    single pass. Returns a list of ``(temperature, pressure, humidity)`` ADC
+    value tuples, ready for :py:meth:`Calibration.compensate`.
+    """
+    with memoryview(buffer) as view:
+        view = view.cast("B")
+        if count is None:
+            count = (len(view) - offset) // _data_block.size
+        end = offset + count * _data_block.size
+        if end > len(view):
+            raise ValueError("Buffer too short for {0} blocks from offset {1}".format(count, offset))
+        return [(t_msb << 4 | t_xlsb >> 4, p_msb << 4 | p_xlsb >> 4, h)
+                for p_msb, p_xlsb, t_msb, t_xlsb, h in _data_block.iter_unpack(view[offset:end])]
+
+
+def _format(value, fmt):
+    # Skipped channels have no value
+    return "None" if value is None else fmt.format(value)
+
+
+def _tfine(t, comp):
+    v1 = (t / 16384.0 - comp.dig_T1 / 1024.0) * comp.dig_T2
+    v2 = ((t / 131072.0 - comp.dig_T1 / 8192.0) ** 2) * comp.dig_T3
+    return v1 + v2
+
+
+def _humidity(h, tfine, comp):
+    # Unclamped, so that it also works on NumPy arrays
+    res = tfine - 76800.0
+    res = (h - (comp.dig_H4 * 64.0 + comp.dig_H5 / 16384.0 * res)) * (comp.dig_H2 / 65536.0 * (1.0 + comp.dig_H6 / 67108864.0 * res * (1.0 + comp.dig_H3 / 67108864.0 * res)))
+    return res * (1.0 - (comp.dig_H1 * res / 524288.0))
+
+
+def _calc_humidity(h, tfine, comp):
+    return max(0.0, min(_humidity(h, tfine, comp), 100.0))
+
+
+def _pressure_coefficients(tfine, comp):
+    v1 = tfine / 2.0 - 64000.0
+    v2 = v1 * v1 * comp.dig_P6 / 32768.0
+    v2 = v2 + v1 * comp.dig_P5 * 2.0
+    v2 = v2 / 4.0 + comp.dig_P4 * 65536.0
+    v1 = (comp.dig_P3 * v1 * v1 / 524288.0 + comp.dig_P2 * v1) / 524288.0
+    v1 = (1.0 + v1 / 32768.0) * comp.dig_P1
+    return v1, v2
+
+
+def _pressure(p, v1, v2, comp):
+    res = 1048576.0 - p
+    res = ((res - v2 / 4096.0) * 6250.0) / v1
+    v1 = comp.dig_P9 * res * res / 2147483648.0
+    v2 = res * comp.dig_P8 / 32768.0
+    return res + (v1 + v2 + comp.dig_P7) / 16.0
+
+
+def _calc_pressure(p, tfine, comp):
+    v1, v2 = _pressure_coefficients(tfine, comp)
+
+    # Prevent divide by zero
+    if v1 == 0:
+        return 0
+    return _pressure(p, v1, v2, comp)
+
+
+def compensate_float(raw_readings, compensation_params):
+    """
+    Floating point compensation engine, using the double precision formulas
+    from Appendix A (8.1) of the datasheet. Returns a (temperature, pressure,
+    humidity) tuple in °C, hPa and % rH.
+    """
+    if isinstance(compensation_params, Calibration):
+        return compensation_params.compensate(raw_readings.temperature,
+                                               raw_readings.pressure,
+                                               raw_readings.humidity)
+
+    tfine = _tfine(raw_readings.temperature, compensation_params)
+    pressure = raw_readings.pressure
+    humidity = raw_readings.humidity
+    return (tfine / 5120.0,
+            None if pressure is None else _calc_pressure(pressure, tfine, compensation_params) / 100.0,
+            None if humidity is None else _calc_humidity(humidity, tfine, compensation_params))
+
+
+def _div(a, b):
+    # C integer division truncates towards zero, Python's floors
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def _tfine_int(t, comp):
+    v1 = (((t >> 3) - (comp.dig_T1 << 1)) * comp.dig_T2) >> 11
+    v2 = (((((t >> 4) - comp.dig_T1) * ((t >> 4) - comp.dig_T1)) >> 12) * comp.dig_T3) >> 14
+    return v1 + v2
+
+
+def _calc_humidity_int(h, tfine, comp):
+    res = tfine - 76800
+    res = (((((h << 14) - (comp.dig_H4 << 20) - (comp.dig_H5 * res)) + 16384) >> 15) * (((((((res * comp.dig_H6) >> 10) * (((res * comp.dig_H3) >> 11) + 32768)) >> 10) + 2097152) * comp.dig_H2 + 8192) >> 14))
+    res = res - (((((res >> 15) * (res >> 15)) >> 7) * comp.dig_H1) >> 4)
+    res = max(0, min(res, 419430400))
+    return res >> 12
+
+
+def _calc_pressure_int(p, tfine, comp):
+    v1 = tfine - 128000
+    v2 = v1 * v1 * comp.dig_P6
+    v2 = v2 + ((v1 * comp.dig_P5) << 17)
+    v2 = v2 + (comp.dig_P4 << 35)
+    v1 = ((v1 * v1 * comp.dig_P3) >> 8) + ((v1 * comp.dig_P2) << 12)
+    v1 = (((1 << 47) + v1) * comp.dig_P1) >> 33
+
+    # Prevent divide by zero
+    if v1 == 0:
+        return 0
+
+    res = 1048576 - p
+    res = _div(((res << 31) - v2) * 3125, v1)
+    v1 = (comp.dig_P9 * (res >> 13) * (res >> 13)) >> 25
+    v2 = (comp.dig_P8 * res) >> 19
+    return ((res + v1 + v2) >> 8) + (comp.dig_P7 << 4)
+
+
+def compensate_int(raw_readings, compensation_params):
+    """
+    Integer compensation engine, using the 32/64-bit fixed point formulas from
+    section 4.2.3 of the datasheet (``BME280_compensate_T_int32``,
+    ``BME280_compensate_P_int64`` and ``bme280_compensate_H_int32``).
+    Results are reproducible bit-for-bit, and are returned as a (temperature,
+    pressure, humidity) tuple in °C, hPa and % rH, with resolutions of
+    0.01 °C, 1/25600 hPa and 1/1024 % rH respectively.
+    """
+    tfine = _tfine_int(raw_readings.temperature, compensation_params)
+    pressure = raw_readings.pressure
+    humidity = raw_readings.humidity
+    return (((tfine * 5 + 128) >> 8) / 100.0,
+            None if pressure is None else _calc_pressure_int(pressure, tfine, compensation_params) / 25600.0,
+            None if humidity is None else _calc_humidity_int(humidity, tfine, compensation_params) / 1024.0)
+
+
+class Calibration(object):
+    """
+    Compensation params prepared for fast compensation: the constant parts of
+    the floating point formulas are worked out once, up front, and held in
+    slots rather than looked up in a dictionary on every reading.
+
+    Only scaling by powers of two is folded into the coefficients (which is
+    exact in floating point), so :py:meth:`compensate` gives exactly the same
+    results as :py:func:`compensate_float` does with the plain params. The
+    original ``dig_*`` values remain available as attributes, so a
+    ``Calibration`` can be used anywhere compensation params are expected.
+    """
+    __slots__ = ("dig_T1", "dig_T2", "dig_T3",
+                 "dig_P1", "dig_P2", "dig_P3", "dig_P4", "dig_P5",
+                 "dig_P6", "dig_P7", "dig_P8", "dig_P9",
+                 "dig_H1", "dig_H2", "dig_H3", "dig_H4", "dig_H5", "dig_H6",
+                 "_t1a", "_t1b", "_t2", "_t3",
+                 "_p1", "_p2", "_p3", "_p4", "_p5", "_p6", "_p7", "_p8", "_p9",
+                 "_h1", "_h2", "_h3", "_h4", "_h5", "_h6")
+
+    def __init__(self, compensation_params):
+        for name in self.__slots__:
+            if name.startswith("dig_"):
+                setattr(self, name, compensation_params[name])
+
+        self._t1a = self.dig_T1 / 1024.0
+        self._t1b = self.dig_T1 / 8192.0
+        self._t2 = float(self.dig_T2)
+        self._t3 = float(self.dig_T3)
+
+        # v1 and v2 are scaled by 1/32768 and 1/16384 respectively, ahead of
+        # their use in the pressure calculation
+        self._p1 = float(self.dig_P1)
+        self._p2 = self.dig_P2 / 17179869184.0
+        self._p3 = self.dig_P3 / 9007199254740992.0
+        self._p4 = self.dig_P4 * 16.0
+        self._p5 = self.dig_P5 / 8192.0
+        self._p6 = self.dig_P6 / 536870912.0
+        self._p7 = self.dig_P7 / 16.0
+        self._p8 = self.dig_P8 / 524288.0
+        self._p9 = self.dig_P9 / 34359738368.0
+
+        self._h1 = self.dig_H1 / 524288.0
+        self._h2 = self.dig_H2 / 65536.0
+        self._h3 = self.dig_H3 / 67108864.0
+        self._h4 = self.dig_H4 * 64.0
+        self._h5 = self.dig_H5 / 16384.0
+        self._h6 = self.dig_H6 / 67108864.0
+
+    def compensate(self, adc_t, adc_p, adc_h):
+        """
+        Returns a (temperature, pressure, humidity) tuple in °C, hPa and % rH
+        from the raw ADC values. Pressure and humidity are ``None`` if their
+        ADC values are (that is, if the channel was skipped).
+        """
+        d = adc_t / 131072.0 - self._t1b
+        tfine = (adc_t / 16384.0 - self._t1a) * self._t2 + d * d * self._t3
+
+        humidity = None
+        if adc_h is not None:
+            res = tfine - 76800.0
+            res = (adc_h - (self._h4 + self._h5 * res)) * (self._h2 * (1.0 + self._h6 * res * (1.0 + self._h3 * res)))
+            res = res * (1.0 - res * self._h1)
+            humidity = max(0.0, min(res, 100.0))
+
+        pressure = None
+        if adc_p is not None:
+            v1 = tfine / 2.0 - 64000.0
+            v2 = v1 * v1 * self._p6 + v1 * self._p5 + self._p4
+            v1 = (1.0 + (self._p3 * v1 * v1 + self._p2 * v1)) * self._p1
+
+            # Prevent divide by zero
+            if v1 == 0:
+                pressure = 0.0
+            else:
+                res = 1048576.0 - adc_p
+                res = ((res - v2) * 6250.0) / v1
+                res = res + (self._p9 * res * res + res * self._p8 + self._p7)
+                pressure = res / 100.0
+
+        return tfine / 5120.0, pressure, humidity
+
+
+class compact_reading(object):
+    """
+    A lightweight compensated reading, holding just the temperature (°C),
+    pressure (hPa) and humidity (% rH) values and the time the reading was
+    taken as seconds since the epoch (``epoch``). The ``id`` and
+    ``timestamp`` attributes are only created when first accessed.
+    """
+    __slots__ = ("temperature", "pressure", "humidity", "epoch", "_id", "_timestamp")
+
+    def __init__(self, temperature, pressure, humidity, epoch=None):
+        self.temperature = temperature
+        self.pressure = pressure
+        self.humidity = humidity
+        self.epoch = time.time() if epoch is None else epoch
+        self._id = None
+        self._timestamp = None
+
+    @classmethod
+    def from_raw(cls, raw_readings, compensation_params, engine=compensate_float):
+        """
+        Compensates the raw readings with the given engine
+        (:py:func:`compensate_float` or :py:func:`compensate_int`), without
+        keeping hold of either them or the compensation params.
+        """
+        return cls(*engine(raw_readings, compensation_params))
+
+    @property
+    def id(self):
+        if self._id is None:
+            self._id = uuid.uuid4()
+        return self._id
+
+    @id.setter
+    def id(self, value):
+        self._id = value
+
+    @property
+    def timestamp(self):
+        """
+        Python's ``datetime`` object (in UTC) when the reading was taken.
+        """
+        if self._timestamp is None:
+            self._timestamp = datetime.datetime.fromtimestamp(self.epoch, pytz.UTC)
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value):
+        self._timestamp = value
+        self.epoch = value.timestamp()
 
     def __repr__(self):
-        return "uncompensated_reading(temp=0x{0:08X}, pressure=0x{1:08X}, humidity=0x{2:08X}, block={3})".format(
-            self.temperature, self.pressure, self.humidity,
-            ":".join("{0:02X}".format(c) for c in self._block))
+        return "compact_reading(timestamp={0:%Y-%m-%d %H:%M:%S.%f%Z}, temp={1} °C, pressure={2} hPa, humidity={3} % rH)".format(
+            self.timestamp, _format(self.temperature, "{0:0.3f}"),
+            _format(self.pressure, "{0:0.2f}"), _format(self.humidity, "{0:0.2f}"))
 
 
-class compensated_readings(object):
+class compensated_readings(compact_reading):
     """
     Compensation formulas translated from Appendix A (8.1) of BME280 datasheet:
 
@@ -73,51 +426,22 @@ class compensated_readings(object):
 
       * Humidity in %rH as as double. Output value of "46.332" represents
         46.332 %rH
+
+    The integer formulas from section 4.2.3 of the datasheet can be used
+    instead by passing ``engine=compensate_int``.
+
+    Unlike :py:class:`compact_reading`, this also keeps hold of the
+    uncompensated readings and compensation params.
     """
-    def __init__(self, raw_readings, compensation_params):
+    def __init__(self, raw_readings, compensation_params, engine=compensate_float):
+        super(compensated_readings, self).__init__(*engine(raw_readings, compensation_params))
         self._comp = compensation_params
-        self.id = uuid.uuid4()
         self.uncompensated = raw_readings
-        self.timestamp = datetime.datetime.utcnow().replace(tzinfo=pytz.UTC)
-        self.temperature = self.__tfine(raw_readings.temperature) / 5120.0
-        self.humidity = self.__calc_humidity(raw_readings.humidity,
-                                             raw_readings.temperature)
-        self.pressure = self.__calc_pressure(raw_readings.pressure,
-                                             raw_readings.temperature) / 100.0
-
-    def __tfine(self, t):
-        v1 = (t / 16384.0 - self._comp.dig_T1 / 1024.0) * self._comp.dig_T2
-        v2 = ((t / 131072.0 - self._comp.dig_T1 / 8192.0) ** 2) * self._comp.dig_T3
-        return v1 + v2
-
-    def __calc_humidity(self, h, t):
-        res = self.__tfine(t) - 76800.0
-        res = (h - (self._comp.dig_H4 * 64.0 + self._comp.dig_H5 / 16384.0 * res)) * (self._comp.dig_H2 / 65536.0 * (1.0 + self._comp.dig_H6 / 67108864.0 * res * (1.0 + self._comp.dig_H3 / 67108864.0 * res)))
-        res = res * (1.0 - (self._comp.dig_H1 * res / 524288.0))
-        return max(0.0, min(res, 100.0))
-
-    def __calc_pressure(self, p, t):
-        v1 = self.__tfine(t) / 2.0 - 64000.0
-        v2 = v1 * v1 * self._comp.dig_P6 / 32768.0
-        v2 = v2 + v1 * self._comp.dig_P5 * 2.0
-        v2 = v2 / 4.0 + self._comp.dig_P4 * 65536.0
-        v1 = (self._comp.dig_P3 * v1 * v1 / 524288.0 + self._comp.dig_P2 * v1) / 524288.0
-        v1 = (1.0 + v1 / 32768.0) * self._comp.dig_P1
-
-        # Prevent divide by zero
-        if v1 == 0:
-            return 0
-
-        res = 1048576.0 - p
-        res = ((res - v2 / 4096.0) * 6250.0) / v1
-        v1 = self._comp.dig_P9 * res * res / 2147483648.0
-        v2 = res * self._comp.dig_P8 / 32768.0
-        res = res + (v1 + v2 + self._comp.dig_P7) / 16.0
-        return res
 
     def __repr__(self):
-        return "compensated_reading(id={0}, timestamp={1:%Y-%m-%d %H:%M:%S.%f%Z}, temp={2:0.3f} °C, pressure={3:0.2f} hPa, humidity={4:0.2f} % rH)".format(
-            self.id, self.timestamp, self.temperature, self.pressure, self.humidity)
+        return "compensated_reading(id={0}, timestamp={1:%Y-%m-%d %H:%M:%S.%f%Z}, temp={2} °C, pressure={3} hPa, humidity={4} % rH)".format(
+            self.id, self.timestamp, _format(self.temperature, "{0:0.3f}"),
+            _format(self.pressure, "{0:0.2f}"), _format(self.humidity, "{0:0.2f}"))
 
 
 class params(dict):
@@ -126,28 +450,119 @@ class params(dict):
     __delattr__ = dict.__delitem__
 
 
-class memoize:
-    def __init__(self, f):
-        self.f = f
-        self.memo = {}
-
-    def __call__(self, *args):
-        if args not in self.memo:
-            self.memo[args] = self.f(*args)
-        return self.memo[args]
+cache_stats = collections.namedtuple("cache_stats", "hits misses load_time size maxsize")
 
 
-def load_calibration_params(bus, address=DEFAULT_PORT):
+class CalibrationCache(object):
     """
-    The BME280 output consists of the ADC output values. However, each sensing
-    element behaves differently. Therefore, the actual pressure and temperature
-    must be calculated using a set of calibration parameters.
-
-    The calibration parameters are subsequently used to with some compensation
-    formula to perform temperature readout in degC, humidity in % and pressure
-    in hPA.
+    Thread-safe cache of calibration, keyed by ``(bus, address)``, which holds
+    at most ``maxsize`` entries, discarding the least recently used when full.
+    Entries can be explicitly invalidated, for example when a sensor is
+    swapped or a bus reopened, and :py:meth:`stats` reports the number of
+    hits and misses and the total time spent loading calibration.
     """
-    read = reader(bus, address)
+    def __init__(self, loader, maxsize=32):
+        self._loader = loader
+        self._maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._load_time = 0.0
+
+    def __call__(self, bus, address=DEFAULT_PORT):
+        key = (bus, address)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+
+        # Load without holding the lock, so as not to hold up other sensors
+        start = time.monotonic()
+        value = self._loader(bus, address)
+        elapsed = time.monotonic() - start
+
+        with self._lock:
+            self._load_time += elapsed
+            self._entries[key] = value
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, bus, address=None):
+        """
+        Discards the cached calibration for the sensor at the given address on
+        the bus, or for every sensor on the bus if no address is given.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] is bus and address in (None, key[1]):
+                    del self._entries[key]
+
+    def clear(self):
+        """
+        Discards all cached calibration.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns a ``cache_stats(hits, misses, load_time, size, maxsize)``
+        named tuple, where ``load_time`` is the total time (in seconds) spent
+        loading calibration on misses.
+        """
+        with self._lock:
+            return cache_stats(self._hits, self._misses, self._load_time,
+                               len(self._entries), self._maxsize)
+
+
+# Trimming parameter layout, see section 4.2.2 of the datasheet: dig_T1 to
+# dig_P9 are little-endian words at 0x88-0x9F, 0xA0 is unused and dig_H1 is at
+# 0xA1. The remaining humidity params are packed into 0xE1-0xE7.
+__calibration_block_1 = struct.Struct("<HhhHhhhhhhhhxB")
+__calibration_block_2 = struct.Struct("<hbbbbb")
+
+
+def __humidity_params(compensation_params, e4, e5, e6):
+    compensation_params.dig_H4 = e4 << 4 | e5 & 0x0F
+    compensation_params.dig_H5 = ((e5 >> 4) & 0x0F) | (e6 << 4)
+
+
+def __decode_calibration(block_1, block_2):
+    compensation_params = params()
+
+    (compensation_params.dig_T1,
+     compensation_params.dig_T2,
+     compensation_params.dig_T3,
+     compensation_params.dig_P1,
+     compensation_params.dig_P2,
+     compensation_params.dig_P3,
+     compensation_params.dig_P4,
+     compensation_params.dig_P5,
+     compensation_params.dig_P6,
+     compensation_params.dig_P7,
+     compensation_params.dig_P8,
+     compensation_params.dig_P9,
+     compensation_params.dig_H1) = __calibration_block_1.unpack(block_1)
+
+    (compensation_params.dig_H2,
+     compensation_params.dig_H3,
+     e4, e5, e6,
+     compensation_params.dig_H6) = __calibration_block_2.unpack(block_2)
+
+    __humidity_params(compensation_params, e4, e5, e6)
+    return compensation_params
+
+
+def __load_calibration_params_by_block(read):
+    return __decode_calibration(read.block(0x88, __calibration_block_1.size),
+                                read.block(0xE1, __calibration_block_2.size))
+
+
+def __load_calibration_params_by_register(read):
     compensation_params = params()
 
     # Temperature trimming params
@@ -175,24 +590,374 @@ def load_calibration_params(bus, address=DEFAULT_PORT):
     e5 = read.signed_byte(0xE5)
     e6 = read.signed_byte(0xE6)
 
-    compensation_params.dig_H4 = e4 << 4 | e5 & 0x0F
-    compensation_params.dig_H5 = ((e5 >> 4) & 0x0F) | (e6 << 4)
+    __humidity_params(compensation_params, e4, e5, e6)
     compensation_params.dig_H6 = read.signed_byte(0xE7)
 
     return compensation_params
 
 
-__cache_calibration_params = memoize(load_calibration_params)
+def load_calibration_params(bus, address=DEFAULT_PORT):
+    """
+    The BME280 output consists of the ADC output values. However, each sensing
+    element behaves differently. Therefore, the actual pressure and temperature
+    must be calculated using a set of calibration parameters.
+
+    The calibration parameters are subsequently used to with some compensation
+    formula to perform temperature readout in degC, humidity in % and pressure
+    in hPA.
+
+    The parameters are fetched with two I2C block reads; if the bus adapter
+    does not support block reads, they are read one register at a time
+    instead. Any other error (say, the sensor not acknowledging) is raised.
+    """
+    read = reader(bus, address)
+    try:
+        return __load_calibration_params_by_block(read)
+    except OSError as e:
+        if not _unsupported(e):
+            raise
+        return __load_calibration_params_by_register(read)
 
 
-def __calc_delay(t_oversampling, h_oversampling, p_oversampling):
-    t_delay = 0.000575 + 0.0023 * (1 << t_oversampling)
-    h_delay = 0.000575 + 0.0023 * (1 << h_oversampling)
-    p_delay = 0.001250 + 0.0023 * (1 << p_oversampling)
+def _unsupported(error):
+    """
+    Whether an ``OSError`` is the bus adapter rejecting the operation (as
+    some do block reads), rather than a failed transaction.
+    """
+    return error.errno in (errno.EOPNOTSUPP, errno.ENOTSUP)
+
+
+def load_calibration(bus, address=DEFAULT_PORT):
+    """
+    Loads the calibration params, returning them as a :py:class:`Calibration`
+    object ready for fast compensation.
+    """
+    return Calibration(load_calibration_params(bus, address))
+
+
+def _calibration(compensation_params):
+    if isinstance(compensation_params, Calibration):
+        return compensation_params
+    return Calibration(compensation_params)
+
+
+def __read_nvm(read):
+    """
+    Returns the raw calibration NVM, registers 0x88-0xA1 and 0xE1-0xE7, a
+    word at a time if the bus adapter does not support block reads.
+    """
+    try:
+        return (read.block(0x88, __calibration_block_1.size),
+                read.block(0xE1, __calibration_block_2.size))
+    except OSError as e:
+        if not _unsupported(e):
+            raise
+
+    block_1 = struct.pack("<13H", *(read.unsigned_short(r) for r in range(0x88, 0xA2, 2)))
+    block_2 = struct.pack("<HHHB", read.unsigned_short(0xE1), read.unsigned_short(0xE3),
+                          read.unsigned_short(0xE5), read.unsigned_byte(0xE7))
+    return block_1, block_2
+
+
+def _read_calibration(bus, address=DEFAULT_PORT):
+    """
+    Reads the chip id and the whole calibration NVM once, returning the
+    sensor's :py:func:`nvm_fingerprint` along with the calibration params
+    held in it.
+    """
+    read = reader(bus, address)
+    chip_id = read.unsigned_byte(0xD0)
+    block_1, block_2 = __read_nvm(read)
+    return _fingerprint(chip_id, block_1, block_2), __decode_calibration(block_1, block_2)
+
+
+def nvm_fingerprint(bus, address=DEFAULT_PORT):
+    """
+    Returns a short string identifying the sensor and its calibration, made
+    up from the chip id and a CRC of all the trimming params in its NVM.
+
+    There is nothing smaller on the sensor which changes along with its
+    calibration, so this reads the whole NVM: it takes one more I2C
+    transaction than :py:func:`load_calibration_params` (for the chip id)
+    and is no cheaper, but identifies the sensor by a short string.
+    """
+    return _read_calibration(bus, address)[0]
+
+
+def _fingerprint(chip_id, block_1, block_2):
+    # 0xA0 (between dig_P9 and dig_H1) is not part of the calibration and
+    # its contents are undefined, so it is left out
+    crc = zlib.crc32(block_1[:24] + block_1[25:])
+    crc = zlib.crc32(block_2, crc)
+    return "{0:02X}-{1:08X}".format(chip_id, crc & 0xFFFFFFFF)
+
+
+def _nvm_blocks(compensation_params):
+    """
+    Returns the registers 0x88-0xA1 and 0xE1-0xE7 holding the given
+    trimming params.
+    """
+    comp = compensation_params
+    block_1 = __calibration_block_1.pack(
+        comp.dig_T1, comp.dig_T2, comp.dig_T3,
+        comp.dig_P1, comp.dig_P2, comp.dig_P3, comp.dig_P4, comp.dig_P5,
+        comp.dig_P6, comp.dig_P7, comp.dig_P8, comp.dig_P9,
+        comp.dig_H1)
+    block_2 = struct.pack("<hBBBBB", comp.dig_H2, comp.dig_H3 & 0xFF,
+                          (comp.dig_H4 >> 4) & 0xFF,
+                          (comp.dig_H4 & 0x0F) | (comp.dig_H5 & 0x0F) << 4,
+                          (comp.dig_H5 >> 4) & 0xFF,
+                          comp.dig_H6 & 0xFF)
+    return block_1, block_2
+
+
+def calibration_fingerprint(compensation_params):
+    """
+    Returns the :py:func:`nvm_fingerprint` that a BME280 with the given
+    calibration params would have, so that params already loaded can be
+    checked against a sensor.
+    """
+    return _fingerprint(CHIP_ID, *_nvm_blocks(compensation_params))
+
+
+calibration_cache = CalibrationCache(load_calibration)
+
+
+def _calc_delay(t_oversampling, h_oversampling, p_oversampling):
+    # Skipped channels take no time to measure
+    t_delay = 0.001250 + 0.0023 * (1 << t_oversampling)
+    h_delay = 0.000575 + 0.0023 * (1 << h_oversampling) if h_oversampling else 0
+    p_delay = 0.000575 + 0.0023 * (1 << p_oversampling) if p_oversampling else 0
     return t_delay + h_delay + p_delay
 
 
-def sample(bus, address=DEFAULT_PORT, compensation_params=None, sampling=oversampling.x1):
+def _config(standby, iir_filter):
+    """
+    Returns the value of the config register for the given standby time and
+    IIR filter coefficient.
+    """
+    if standby not in range(len(STANDBY_TIMES)):
+        raise ValueError("Invalid standby time: {0}, see bme280.standby_time".format(standby))
+    if iir_filter not in range(5):
+        raise ValueError("Invalid IIR filter coefficient: {0}, see bme280.filter_coefficient".format(iir_filter))
+    return standby << 5 | iir_filter << 2
+
+
+def _channels(sampling, t_sampling=None, h_sampling=None, p_sampling=None):
+    """
+    Returns the (temperature, humidity, pressure) oversampling, where any not
+    given separately default to ``sampling``. Only the individual channels
+    can be skipped.
+    """
+    if sampling is None:
+        sampling = oversampling.x1
+    elif sampling == oversampling.skip:
+        raise ValueError("Invalid oversampling: {0}, only t_sampling, h_sampling and p_sampling can be skipped".format(sampling))
+    channels = tuple(sampling if s is None else s for s in (t_sampling, h_sampling, p_sampling))
+    for s in (sampling,) + channels:
+        if s not in range(6):
+            raise ValueError("Invalid oversampling: {0}, see bme280.oversampling".format(s))
+    if not channels[0]:
+        raise ValueError("Temperature can not be skipped, it is needed to compensate pressure and humidity")
+    return channels
+
+
+def wait_sleep(bus, address, timeout):
+    """
+    Completion strategy which simply sleeps for the maximum conversion time.
+    """
+    time.sleep(timeout)
+
+
+def wait_ready(bus, address=DEFAULT_PORT, timeout=0.01, interval=0.0005):
+    """
+    Waits for the sensor to finish copying its NVM to the image registers,
+    as it does after power on or a reset, by polling the ``im_update`` bit of
+    the status register (0xF3). The sensor may not respond at all in the
+    meantime. Raises ``TimeoutError`` if it is not ready within ``timeout``
+    seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if not bus.read_byte_data(address, 0xF3) & 0x01:  # im_update
+                return
+        except OSError:
+            pass
+        if time.monotonic() >= deadline:
+            raise TimeoutError("BME280 at 0x{0:02X} not ready after reset".format(address))
+        time.sleep(interval)
+
+
+def reset(bus, address=DEFAULT_PORT, timeout=0.01):
+    """
+    Soft resets the sensor, which returns all its registers to their power
+    on values (leaving it in sleep mode), and waits for it to be ready again.
+    """
+    bus.write_byte_data(address, 0xE0, 0xB6)  # reset
+    wait_ready(bus, address, timeout)
+
+
+def _check_calibration(bus, address, compensation_params):
+    """
+    Checks calibration against the sensor's :py:func:`nvm_fingerprint`,
+    replacing it with the params read from the NVM if it no longer matches.
+    ``None`` stands for the calibration in :py:data:`calibration_cache`,
+    which is invalidated if it doesn't match (and ``None`` returned).
+    """
+    fingerprint, loaded = _read_calibration(bus, address)
+    if compensation_params is None:
+        if calibration_fingerprint(calibration_cache(bus, address)) != fingerprint:
+            calibration_cache.invalidate(bus, address)
+        return None
+    if calibration_fingerprint(compensation_params) != fingerprint:
+        return Calibration(loaded)
+    return compensation_params
+
+
+class Retry(object):
+    """
+    Error recovery for :py:func:`sample`: if reading the sensor fails with
+    an ``OSError``, it is retried up to ``attempts`` more times, after a
+    delay which backs off exponentially from ``backoff`` up to
+    ``max_backoff`` seconds. Before each retry the sensor is soft reset (if
+    ``reset`` is set) to get it out of whatever state it is stuck in.
+
+    The sensor's whole calibration NVM is read again after recovering, and
+    the calibration in use replaced if its :py:func:`nvm_fingerprint` no
+    longer matches (say, after a sensor swap or NVM corruption).
+    """
+    def __init__(self, attempts=3, backoff=0.001, max_backoff=0.1, reset=True):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.reset = reset
+
+    def _recover(self, bus, address, compensation_params, on_recover):
+        if self.reset:
+            reset(bus, address)
+        if on_recover is not None:
+            on_recover()
+        return _check_calibration(bus, address, compensation_params)
+
+    def __call__(self, bus, address, compensation_params, fn, on_recover=None):
+        """
+        Calls ``fn`` with the calibration for the sensor (from
+        :py:data:`calibration_cache` if ``compensation_params`` is ``None``),
+        retrying as above. ``on_recover``, if given, is called before each
+        retry, after the sensor has been reset: the sensor's registers may
+        have been reset (by a brown-out, if not by a soft reset) so any
+        state held about them should be discarded.
+        """
+        delay = self.backoff
+        attempt = 0
+        while True:
+            try:
+                comp = compensation_params
+                if comp is None:
+                    comp = calibration_cache(bus, address)
+                return fn(comp)
+            except OSError:
+                if attempt >= self.attempts:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+                try:
+                    compensation_params = self._recover(bus, address, compensation_params, on_recover)
+                except OSError:
+                    # Still failing, back off further and try again
+                    pass
+
+
+class StatusPoll(object):
+    """
+    Completion strategy which polls the ``measuring`` bit of the status
+    register (0xF3), so that the reading is taken as soon as the conversion
+    has finished rather than after the maximum conversion time. Polls back
+    off exponentially from ``interval`` up to ``max_interval`` seconds, and
+    the maximum conversion time is used as a timeout.
+
+    The time taken by previous conversions is remembered, and most of it
+    spent sleeping before the first poll, to keep bus traffic down. Use a
+    separate instance for each sensor.
+    """
+    def __init__(self, interval=0.0005, max_interval=0.004):
+        self._interval = interval
+        self._max_interval = max_interval
+        self._estimates = {}
+
+    def __call__(self, bus, address, timeout):
+        start = time.monotonic()
+        deadline = start + timeout
+        estimate = self._estimates.get(timeout, 0.0)
+        if estimate:
+            time.sleep(min(estimate * 0.9, timeout))
+
+        interval = self._interval
+        while bus.read_byte_data(address, 0xF3) & 0x08:  # measuring
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, self._max_interval)
+
+        elapsed = time.monotonic() - start
+        self._estimates[timeout] = (estimate * 3 + elapsed) / 4 if estimate else elapsed
+
+
+def _trigger(bus, address, channels):
+    """
+    Starts a forced mode conversion and returns how long (in seconds) it will
+    take to complete.
+    """
+    mode = FORCED_MODE
+    t_oversampling, h_oversampling, p_oversampling = channels
+
+    bus.write_byte_data(address, 0xF2, h_oversampling)  # ctrl_hum
+    bus.write_byte_data(address, 0xF4, t_oversampling << 5 | p_oversampling << 2 | mode)  # ctrl
+    return _calc_delay(t_oversampling, h_oversampling, p_oversampling)
+
+
+# Data registers to read (start and length), by whether humidity and pressure
+# are being measured: press_msb to hum_lsb is 0xF7-0xFE, with temperature
+# in the middle from 0xFA-0xFC
+__read_plans = {
+    (True, True): (0xF7, 8),
+    (False, True): (0xF7, 6),
+    (True, False): (0xFA, 5),
+    (False, False): (0xFA, 3)
+}
+
+
+def _read_plan(channels):
+    """
+    Returns the start register and number of registers to read for the
+    given (temperature, humidity, pressure) oversampling.
+    """
+    if channels is None:
+        return 0xF7, 8
+    return __read_plans[bool(channels[1]), bool(channels[2])]
+
+
+def _read(bus, address, compensation_params, compact=False, engine=compensate_float,
+          channels=None):
+    """
+    Burst reads the data registers and returns a compensated reading. Only
+    the registers for channels enabled in the given oversampling are read.
+    """
+    register, length = _read_plan(channels)
+    block = bus.read_i2c_block_data(address, register, length)
+    raw_data = uncompensated_readings(block, register)
+
+    if compact:
+        return compact_reading.from_raw(raw_data, compensation_params, engine)
+    return compensated_readings(raw_data, compensation_params, engine)
+
+
+def sample(bus, address=DEFAULT_PORT, compensation_params=None, sampling=oversampling.x1,
+           compact=False, engine=compensate_float, wait=wait_sleep,
+           t_sampling=None, h_sampling=None, p_sampling=None, retry=None):
     """
     Primes the sensor for reading (defaut: x1 oversampling), pauses for a set
     amount of time so that the reading stabilizes, and then returns a
@@ -202,20 +967,40 @@ def sample(bus, address=DEFAULT_PORT, compensation_params=None, sampling=oversam
       * temperature (in degrees Celcius)
       * humidity (in % relative humidity)
       * pressure (in hPa)
+
+    If ``compact`` is set, a :py:class:`compact_reading` is returned instead,
+    which is cheaper to create but does not retain the uncompensated reading.
+
+    The compensation ``engine`` may be either :py:func:`compensate_float`
+    (the default) or :py:func:`compensate_int`.
+
+    If no compensation params are supplied, they are loaded from the sensor
+    on first use and kept in :py:data:`calibration_cache`.
+
+    How to wait for the conversion to complete is determined by ``wait``:
+    either :py:func:`wait_sleep` (the default), or a :py:class:`StatusPoll`
+    instance.
+
+    Oversampling can be set for each channel separately with ``t_sampling``,
+    ``h_sampling`` and ``p_sampling``, overriding ``sampling``. Humidity and
+    pressure can be skipped altogether (``oversampling.skip``), which shortens
+    the conversion time; their values in the returned reading are then
+    ``None``.
+
+    Errors talking to the sensor are raised as ``OSError``, unless a
+    :py:class:`Retry` policy is given as ``retry``, in which case they are
+    retried (resetting the sensor first) before giving up.
     """
-    if compensation_params is None:
-        compensation_params = __cache_calibration_params(bus, address)
+    channels = _channels(sampling, t_sampling, h_sampling, p_sampling)
 
-    mode = 1  # forced
-    t_oversampling = sampling or oversampling.x1
-    h_oversampling = sampling or oversampling.x1
-    p_oversampling = sampling or oversampling.x1
+    def sample_once(compensation_params):
+        delay = _trigger(bus, address, channels)
+        wait(bus, address, delay)
+        return _read(bus, address, compensation_params, compact, engine, channels)
 
-    bus.write_byte_data(address, 0xF2, h_oversampling)  # ctrl_hum
-    bus.write_byte_data(address, 0xF4, t_oversampling << 5 | p_oversampling << 2 | mode)  # ctrl
-    delay = __calc_delay(t_oversampling, h_oversampling, p_oversampling)
-    time.sleep(delay)
+    if retry is not None:
+        return retry(bus, address, compensation_params, sample_once)
 
-    block = bus.read_i2c_block_data(address, 0xF7, 8)
-    raw_data = uncompensated_readings(block)
-    return compensated_readings(raw_data, compensation_params)
+    if compensation_params is None:
+        compensation_params = calibration_cache(bus, address)
+    return sample_once(compensation_params)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Asynchronous sampling: rather than blocking the calling thread for the
+duration of a conversion, the event loop is free to trigger and read other
+sensors in the meantime. Bus I/O runs in an executor, with access to each bus
+serialised by a lock.
+"""
+
+import asyncio
+import weakref
+
+from bme280 import DEFAULT_PORT, oversampling, calibration_cache, compensate_float, \
+    _calibration, _channels, _trigger, _read
+
+# Locks by event loop, then bus: an asyncio.Lock can only be used from the
+# loop it was first used in
+_bus_locks = weakref.WeakKeyDictionary()
+
+
+def _bus_lock(loop, bus):
+    locks = _bus_locks.get(loop)
+    if locks is None:
+        locks = _bus_locks[loop] = weakref.WeakKeyDictionary()
+    lock = locks.get(bus)
+    if lock is None:
+        lock = locks[bus] = asyncio.Lock()
+    return lock
+
+
+async def _run(executor, bus, fn, *args):
+    loop = asyncio.get_event_loop()
+    async with _bus_lock(loop, bus):
+        return await loop.run_in_executor(executor, fn, bus, *args)
+
+
+async def sample_async(bus, address=DEFAULT_PORT, compensation_params=None,
+                       sampling=oversampling.x1, executor=None, compact=False):
+    """
+    Coroutine equivalent of :py:func:`bme280.sample`: triggers a conversion,
+    awaits for it to complete without blocking the event loop, and then
+    returns a compensated reading.
+
+    :param executor: the :py:class:`concurrent.futures.Executor` to run bus
+        I/O in (default: the event loop's default executor).
+    :param compact: if set, a :py:class:`bme280.compact_reading` is returned.
+    """
+    if compensation_params is None:
+        compensation_params = await _run(executor, bus, calibration_cache, address)
+
+    channels = _channels(sampling)
+    delay = await _run(executor, bus, _trigger, address, channels)
+    await asyncio.sleep(delay)
+    return await _run(executor, bus, _read, address, compensation_params, compact,
+                      compensate_float, channels)
+
+
+async def stream_async(bus, address=DEFAULT_PORT, compensation_params=None,
+                       sampling=oversampling.x1, interval=1.0, executor=None,
+                       compact=False):
+    """
+    Asynchronous iterator yielding a compensated reading every ``interval``
+    seconds, for example::
+
+        async for data in bme280.aio.stream_async(bus, 0x76, interval=5):
+            print(data)
+    """
+    if compensation_params is None:
+        compensation_params = await _run(executor, bus, calibration_cache, address)
+    else:
+        compensation_params = _calibration(compensation_params)
+
+    loop = asyncio.get_event_loop()
+    due = loop.time()
+    while True:
+        yield await sample_async(bus, address, compensation_params, sampling, executor, compact)
+        due += interval
+        await asyncio.sleep(max(0, due - loop.time()))
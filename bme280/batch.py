@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Vectorised compensation of many raw readings at once, for example when
+reprocessing archived data. Requires NumPy (``pip install RPi.bme280[numpy]``).
+"""
+
+import numpy as np
+
+from bme280 import _humidity, _pressure, _pressure_coefficients, _tfine
+
+
+def decode_batch(blocks):
+    """
+    Decodes an (N, 8) array of raw data register blocks (as read from 0xF7
+    onwards) into an (N, 3) array of ADC values, with columns temperature,
+    pressure and humidity.
+    """
+    blocks = np.asarray(blocks, dtype=np.int64)
+    if blocks.ndim != 2 or blocks.shape[1] != 8:
+        raise ValueError("Expected an (N, 8) array of raw blocks, got shape {0}".format(blocks.shape))
+
+    adc = np.empty((blocks.shape[0], 3), dtype=np.int64)
+    adc[:, 0] = (blocks[:, 3] << 16 | blocks[:, 4] << 8 | blocks[:, 5]) >> 4
+    adc[:, 1] = (blocks[:, 0] << 16 | blocks[:, 1] << 8 | blocks[:, 2]) >> 4
+    adc[:, 2] = blocks[:, 6] << 8 | blocks[:, 7]
+    return adc
+
+
+def _calc_pressure(p, tfine, comp):
+    v1, v2 = _pressure_coefficients(tfine, comp)
+
+    # Prevent divide by zero
+    zero = v1 == 0
+    res = _pressure(p, np.where(zero, 1.0, v1), v2, comp)
+    return np.where(zero, 0.0, res)
+
+
+def compensate_batch(raw_array, compensation_params):
+    """
+    Applies the same compensation formulas as
+    :py:class:`bme280.compensated_readings` to a whole array of readings in
+    one go, giving identical results.
+
+    :param raw_array: either an (N, 8) array of raw data register blocks, or
+        an (N, 3) array of ADC values with columns temperature, pressure and
+        humidity.
+    :param compensation_params: the sensor's calibration parameters.
+    :returns: a tuple of three length N float arrays: temperature (°C),
+        pressure (hPa) and humidity (% rH).
+    """
+    raw_array = np.asarray(raw_array)
+    if raw_array.ndim == 2 and raw_array.shape[1] == 8:
+        adc = decode_batch(raw_array)
+    elif raw_array.ndim == 2 and raw_array.shape[1] == 3:
+        adc = raw_array.astype(np.int64)
+    else:
+        raise ValueError("Expected an (N, 8) or (N, 3) array, got shape {0}".format(raw_array.shape))
+
+    t = adc[:, 0].astype(np.float64)
+    p = adc[:, 1].astype(np.float64)
+    h = adc[:, 2].astype(np.float64)
+
+    tfine = _tfine(t, compensation_params)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (tfine / 5120.0,
+                _calc_pressure(p, tfine, compensation_params) / 100.0,
+                np.clip(_humidity(h, tfine, compensation_params), 0.0, 100.0))
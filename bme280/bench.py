@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Benchmarks of the per-reading costs, against a simulated bus so they can be
+run anywhere. Run with ``python -m bme280.bench``; results are written as
+JSON so they can be compared across releases.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+
+import bme280
+from bme280 import Calibration, compact_reading, compensate_float, \
+    compensate_int, compensated_readings, load_calibration_params, sample, \
+    uncompensated_readings, StatusPoll
+from bme280.simulator import CALIBRATION, SimulatedBus
+
+BLOCK = [0x54, 0x2B, 0x00, 0x80, 0x46, 0x00, 0x6E, 0x8C]
+
+
+def _timed(fn, iterations):
+    total = timeit.timeit(fn, number=iterations)
+    return {"iterations": iterations, "total": total, "per_op": total / iterations}
+
+
+def bench_compute(iterations):
+    """
+    Times decoding and compensating a block of data registers.
+    """
+    raw = uncompensated_readings(BLOCK)
+    calibration = Calibration(CALIBRATION)
+    return {
+        "uncompensated_readings": _timed(lambda: uncompensated_readings(BLOCK), iterations),
+        "compensate_float": _timed(lambda: compensate_float(raw, CALIBRATION), iterations),
+        "compensate_float_calibration": _timed(lambda: compensate_float(raw, calibration), iterations),
+        "compensate_int": _timed(lambda: compensate_int(raw, CALIBRATION), iterations),
+        "compensated_readings": _timed(lambda: compensated_readings(raw, calibration), iterations),
+        "compact_reading": _timed(lambda: compact_reading.from_raw(raw, calibration), iterations),
+    }
+
+
+def bench_calibration(clock_hz):
+    """
+    Counts the I2C transactions and bytes needed to load the calibration
+    params, with and without block read support.
+    """
+    results = {}
+    for name, block_reads in (("load_calibration_params", True),
+                              ("load_calibration_params_by_register", False)):
+        bus = SimulatedBus(clock_hz=clock_hz, realtime=False, block_reads=block_reads)
+        load_calibration_params(bus)
+        results[name] = {"transactions": bus.transactions,
+                         "bytes": bus.bytes_transferred,
+                         "bus_time": bus.bus_time}
+    return results
+
+
+def bench_sample(samples, clock_hz):
+    """
+    Times end-to-end forced mode sampling, in real time against a simulated
+    bus, with each of the completion strategies.
+    """
+    results = {}
+    for name, wait in (("sample", bme280.wait_sleep), ("sample_status_poll", StatusPoll())):
+        bus = SimulatedBus(clock_hz=clock_hz)
+        calibration = Calibration(load_calibration_params(bus))
+        bus.reset_stats()
+
+        start = time.perf_counter()
+        for _ in range(samples):
+            sample(bus, compensation_params=calibration, compact=True, wait=wait)
+        total = time.perf_counter() - start
+
+        results[name] = {"iterations": samples, "total": total,
+                         "per_op": total / samples,
+                         "readings_per_second": samples / total,
+                         "transactions": bus.transactions / samples,
+                         "bus_time": bus.bus_time / samples}
+    return results
+
+
+def run(iterations=100000, samples=50, clock_hz=400000):
+    """
+    Runs all the benchmarks, returning the results as a dictionary.
+    """
+    results = {}
+    results.update(bench_compute(iterations))
+    results.update(bench_calibration(clock_hz))
+    results.update(bench_sample(samples, clock_hz))
+    return {
+        "version": bme280.__version__,
+        "python": platform.python_implementation() + " " + platform.python_version(),
+        "clock_hz": clock_hz,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bme280.bench", description=__doc__.strip())
+    parser.add_argument("--iterations", type=int, default=100000,
+                        help="iterations of each decoding and compensation benchmark")
+    parser.add_argument("--samples", type=int, default=50,
+                        help="readings taken in each sampling benchmark")
+    parser.add_argument("--clock-hz", type=int, default=400000,
+                        help="simulated I2C clock speed")
+    parser.add_argument("--output", "-o", help="file to write the JSON results to (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run(args.iterations, args.samples, args.clock_hz)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+import tempfile
+
+from bme280 import DEFAULT_PORT, Calibration, params, _read_calibration
+
+
+def _default_directory():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return os.path.join(os.path.expanduser(cache_home), "bme280")
+
+
+class CalibrationStore(object):
+    """
+    Persists calibration params to disk, so that short-lived processes do not
+    have to read them from the sensor every time they start. Each sensor's
+    params are kept in a small JSON file, keyed by bus number and address,
+    along with the sensor's :py:func:`bme280.nvm_fingerprint`.
+
+    Verifying the fingerprint means reading the whole calibration NVM, which
+    costs as many I2C transactions as loading the params from the sensor in
+    the first place (one more, for the chip id), so a verified load saves no
+    bus traffic. If it no longer matches (say, because the sensor was
+    swapped) the params just read are stored in place of the old ones. Only
+    with ``verify=False``, where the stored params are trusted without
+    touching the sensor, does the store save transactions; call
+    :py:meth:`invalidate` after replacing a sensor.
+
+    :param directory: where to keep the files, defaults to
+        ``$XDG_CACHE_HOME/bme280`` (or ``~/.cache/bme280``).
+    :param verify: whether to check stored params against the sensor.
+    """
+    def __init__(self, directory=None, verify=True):
+        self.directory = directory or _default_directory()
+        self.verify = verify
+
+    def _path(self, bus_number, address):
+        return os.path.join(self.directory, "bus{0}-0x{1:02x}.json".format(bus_number, address))
+
+    def _read(self, path):
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            return entry["fingerprint"], params(entry["params"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None, None
+
+    def _write(self, path, fingerprint, compensation_params):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"fingerprint": fingerprint, "params": compensation_params}, f)
+            os.replace(tmp, path)
+        except OSError:
+            os.unlink(tmp)
+            raise
+
+    def load(self, bus, bus_number, address=DEFAULT_PORT):
+        """
+        Returns the sensor's calibration as a :py:class:`bme280.Calibration`,
+        from disk if the stored fingerprint still matches the sensor (or
+        if not verifying), otherwise from the sensor itself.
+
+        :param bus: the SMBus instance the sensor is attached to.
+        :param bus_number: the bus number (as in ``/dev/i2c-<bus_number>``),
+            used with the address to identify the sensor.
+        """
+        path = self._path(bus_number, address)
+        stored_fingerprint, compensation_params = self._read(path)
+        if compensation_params is not None and not self.verify:
+            return Calibration(compensation_params)
+
+        fingerprint, loaded = _read_calibration(bus, address)
+        if stored_fingerprint != fingerprint:
+            compensation_params = loaded
+            self._write(path, fingerprint, compensation_params)
+
+        return Calibration(compensation_params)
+
+    def invalidate(self, bus_number, address=DEFAULT_PORT):
+        """
+        Removes any stored calibration for the sensor.
+        """
+        try:
+            os.unlink(self._path(bus_number, address))
+        except FileNotFoundError:
+            pass
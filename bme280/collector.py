@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Collecting readings from many buses with a process per bus, so that
+sampling and compensation on one bus do not contend for the GIL with the
+others. Workers publish readings into a ring of fixed layout records per
+sensor in shared memory, from which the latest (or recent) readings of all
+sensors can be read without any pickling or messaging. Requires Python 3.8
+or later.
+"""
+
+import math
+import multiprocessing
+import struct
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+from bme280 import DEFAULT_PORT, oversampling, compact_reading, \
+    load_calibration, _calc_delay, _channels, _trigger, _read
+
+# Each sensor has a count of readings written, followed by its ring of
+# records. Records start with their sequence number (index + 1), so that
+# ones which have been overwritten can be told apart.
+_count = struct.Struct("<Q")
+_record = struct.Struct("<QdHB5xddd")
+
+
+def _value(value):
+    return math.nan if value is None else value
+
+
+class _Ring(object):
+    """
+    Reads and writes the ring of records for one sensor. There must only be
+    one writer.
+
+    Records are written and read holding ``lock``, shared by the writer and
+    readers. Python gives no control over the order in which stores to
+    shared memory become visible to other processes, which on weakly ordered
+    CPUs (such as the ARM cores of most single board computers) need not be
+    the order they were made in; acquiring and releasing the lock is what
+    orders them.
+    """
+    def __init__(self, buf, slot, depth, lock):
+        self._buf = buf
+        self._depth = depth
+        self._offset = slot * (_count.size + depth * _record.size)
+        self._lock = lock
+
+    def count(self):
+        with self._lock:
+            return self._count()
+
+    def _count(self):
+        return _count.unpack_from(self._buf, self._offset)[0]
+
+    def _record_offset(self, index):
+        return self._offset + _count.size + (index % self._depth) * _record.size
+
+    def write(self, bus_number, address, reading):
+        with self._lock:
+            count = self._count()
+            _record.pack_into(self._buf, self._record_offset(count), count + 1, reading.epoch,
+                              bus_number, address, _value(reading.temperature),
+                              _value(reading.pressure), _value(reading.humidity))
+            _count.pack_into(self._buf, self._offset, count + 1)
+
+    def read(self, index):
+        """
+        Returns the reading with the given index, or ``None`` if it has been
+        overwritten (or not yet written).
+        """
+        with self._lock:
+            return self._read(index)
+
+    def latest(self):
+        """
+        Returns the most recent reading, or ``None`` if there isn't one.
+        """
+        with self._lock:
+            count = self._count()
+            return self._read(count - 1) if count else None
+
+    def _read(self, index):
+        seq, epoch, _, _, temperature, pressure, humidity = _record.unpack_from(
+            self._buf, self._record_offset(index))
+        if seq != index + 1:
+            return None
+        return compact_reading(temperature,
+                               None if math.isnan(pressure) else pressure,
+                               None if math.isnan(humidity) else humidity,
+                               epoch)
+
+
+def _open_smbus(bus_number):
+    from smbus2 import SMBus
+    return SMBus(bus_number)
+
+
+def _collect(shm, bus_number, sensors, depth, lock, channels, interval, stop, open_bus):
+    """
+    Sampling loop run by the worker process for one bus: every interval,
+    conversions are triggered on all its sensors, then they are all read
+    back once the slowest has completed.
+    """
+    bus = open_bus(bus_number)
+    sensors = [(_Ring(shm.buf, slot, depth, lock), address) for slot, address in sensors]
+    calibrations = {}
+    delay = _calc_delay(*channels)
+    try:
+        while not stop.is_set():
+            start = time.monotonic()
+            triggered = []
+            for ring, address in sensors:
+                try:
+                    if address not in calibrations:
+                        calibrations[address] = load_calibration(bus, address)
+                    _trigger(bus, address, channels)
+                    triggered.append((ring, address))
+                except OSError:
+                    # Try again next time round
+                    pass
+
+            time.sleep(delay)
+            for ring, address in triggered:
+                try:
+                    reading = _read(bus, address, calibrations[address], compact=True, channels=channels)
+                except OSError:
+                    continue
+                ring.write(bus_number, address, reading)
+
+            stop.wait(max(0, interval - (time.monotonic() - start)))
+    finally:
+        del sensors
+        bus.close()
+
+
+class Collector(object):
+    """
+    Samples sensors on many buses, with a worker process for each bus.
+    Calibration is loaded by the workers, and sensors that can't be read are
+    retried on the next cycle.
+
+    :param sensors: a list of ``(bus_number, address)`` tuples.
+    :param interval: time in seconds between readings.
+    :param depth: how many readings to keep for each sensor.
+    :param open_bus: opens a bus (in the worker) given its number, defaults
+        to ``smbus2.SMBus``. Must be picklable.
+    """
+    def __init__(self, sensors, sampling=oversampling.x1, interval=1.0, depth=16,
+                 open_bus=_open_smbus):
+        self._sensors = [(bus_number, address or DEFAULT_PORT) for bus_number, address in sensors]
+        self._channels = _channels(sampling)
+        self._interval = interval
+        self._depth = depth
+        self._open_bus = open_bus
+        self._shm = None
+        self._rings = None
+        self._stop = None
+        self._processes = []
+
+    def start(self):
+        """
+        Creates the shared memory and starts the worker processes.
+        """
+        size = len(self._sensors) * (_count.size + self._depth * _record.size)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self._shm.buf[:size] = bytes(size)
+        self._stop = multiprocessing.Event()
+
+        # A lock per bus, shared by its worker and readers of its rings
+        locks = OrderedDict()
+        buses = OrderedDict()
+        self._rings = []
+        for slot, (bus_number, address) in enumerate(self._sensors):
+            lock = locks.setdefault(bus_number, multiprocessing.Lock())
+            buses.setdefault(bus_number, []).append((slot, address))
+            self._rings.append(_Ring(self._shm.buf, slot, self._depth, lock))
+
+        for bus_number, sensors in buses.items():
+            process = multiprocessing.Process(
+                target=_collect, name="bme280-i2c-{0}".format(bus_number),
+                args=(self._shm, bus_number, sensors, self._depth, locks[bus_number], self._channels,
+                      self._interval, self._stop, self._open_bus),
+                daemon=True)
+            process.start()
+            self._processes.append(process)
+        return self
+
+    def latest(self):
+        """
+        Returns a dictionary of the most recent :py:class:`bme280.compact_reading`
+        for each sensor, keyed by ``(bus_number, address)``, or ``None`` for
+        sensors not yet read.
+        """
+        return OrderedDict((sensor, ring.latest()) for sensor, ring in zip(self._sensors, self._rings))
+
+    def history(self, bus_number, address=DEFAULT_PORT):
+        """
+        Returns a list of the readings held for a sensor, oldest first.
+        """
+        ring = self._rings[self._sensors.index((bus_number, address))]
+        count = ring.count()
+        readings = (ring.read(index) for index in range(max(0, count - self._depth), count))
+        return [reading for reading in readings if reading is not None]
+
+    def stop(self):
+        """
+        Stops the workers and frees the shared memory.
+        """
+        if self._stop is not None:
+            self._stop.set()
+        for process in self._processes:
+            process.join(self._interval + 1.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+        if self._shm is not None:
+            self._rings = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Quantities derived from compensated readings: dew point, absolute humidity,
+altitude and sea level pressure. Each has a scalar version, for single
+readings, and a ``_batch`` version operating on whole arrays at once (such
+as those from :py:func:`bme280.batch.compensate_batch` or
+:py:meth:`bme280.history.History.values`), which requires NumPy.
+
+The scalar versions return ``None`` if any value they need is ``None``, as
+it is for channels that were skipped.
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # only needed by the _batch versions
+    np = None
+
+# Magnus formula coefficients for saturation vapour pressure over water
+# (Sonntag, 1990), valid from -45 to 60 °C
+MAGNUS_A = 17.62
+MAGNUS_B = 243.12  # °C
+MAGNUS_C = 6.112  # hPa
+_MAGNUS_C_FRACTION = MAGNUS_C / 100.0  # per % rH
+
+# International barometric formula
+STANDARD_PRESSURE = 1013.25  # hPa
+_BAROMETRIC_SCALE = 44330.0  # m
+_BAROMETRIC_EXPONENT = 1 / 5.255
+_BAROMETRIC_POWER = 5.255
+
+# Water vapour density (g/m³) from vapour pressure (hPa) and temperature (K):
+# 100 / R_v * 1000, where R_v = 461.5 J/(kg K)
+_VAPOUR_DENSITY = 100000.0 / 461.5
+_ZERO_CELSIUS = 273.15  # K
+
+
+def _gamma(temperature, humidity):
+    return math.log(humidity / 100.0) + MAGNUS_A * temperature / (MAGNUS_B + temperature)
+
+
+def dew_point(temperature, humidity):
+    """
+    Dew point (°C) for a temperature (°C) and relative humidity (%).
+    """
+    if temperature is None or humidity is None:
+        return None
+    if humidity <= 0:
+        return -math.inf
+    gamma = _gamma(temperature, humidity)
+    return MAGNUS_B * gamma / (MAGNUS_A - gamma)
+
+
+def absolute_humidity(temperature, humidity):
+    """
+    Absolute humidity (g/m³) for a temperature (°C) and relative humidity
+    (%).
+    """
+    if temperature is None or humidity is None:
+        return None
+    vapour_pressure = _MAGNUS_C_FRACTION * math.exp(MAGNUS_A * temperature / (MAGNUS_B + temperature)) * humidity
+    return _VAPOUR_DENSITY * vapour_pressure / (temperature + _ZERO_CELSIUS)
+
+
+def altitude(pressure, sea_level_pressure=STANDARD_PRESSURE):
+    """
+    Altitude (m) at which the given pressure (hPa) would be measured, given
+    the pressure at sea level (hPa).
+    """
+    if pressure is None:
+        return None
+    return _BAROMETRIC_SCALE * (1.0 - (pressure / sea_level_pressure) ** _BAROMETRIC_EXPONENT)
+
+
+def sea_level_pressure(pressure, altitude):
+    """
+    Pressure at sea level (hPa), for a pressure (hPa) measured at the given
+    altitude (m).
+    """
+    if pressure is None:
+        return None
+    return pressure / (1.0 - altitude / _BAROMETRIC_SCALE) ** _BAROMETRIC_POWER
+
+
+def _array(values):
+    if np is None:
+        raise ImportError("The _batch functions require NumPy: pip install RPi.bme280[numpy]")
+    return np.asarray(values, dtype=np.float64)
+
+
+def dew_point_batch(temperature, humidity):
+    """
+    Dew point (°C) for arrays of temperature (°C) and relative humidity (%).
+    """
+    temperature = _array(temperature)
+    humidity = _array(humidity)
+    dry = humidity <= 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = np.log(humidity / 100.0) + MAGNUS_A * temperature / (MAGNUS_B + temperature)
+        return np.where(dry, -np.inf, MAGNUS_B * gamma / (MAGNUS_A - gamma))
+
+
+def absolute_humidity_batch(temperature, humidity):
+    """
+    Absolute humidity (g/m³) for arrays of temperature (°C) and relative
+    humidity (%).
+    """
+    temperature = _array(temperature)
+    humidity = _array(humidity)
+    vapour_pressure = _MAGNUS_C_FRACTION * np.exp(MAGNUS_A * temperature / (MAGNUS_B + temperature)) * humidity
+    return _VAPOUR_DENSITY * vapour_pressure / (temperature + _ZERO_CELSIUS)
+
+
+def altitude_batch(pressure, sea_level_pressure=STANDARD_PRESSURE):
+    """
+    Altitude (m) for an array of pressures (hPa).
+    """
+    ratio = _array(pressure) / sea_level_pressure
+    return _BAROMETRIC_SCALE * (1.0 - ratio ** _BAROMETRIC_EXPONENT)
+
+
+def sea_level_pressure_batch(pressure, altitude):
+    """
+    Pressure at sea level (hPa) for arrays of pressure (hPa) and altitude
+    (m).
+    """
+    factor = (1.0 - _array(altitude) / _BAROMETRIC_SCALE) ** -_BAROMETRIC_POWER
+    return _array(pressure) * factor
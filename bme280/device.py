@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import time
+
+from bme280 import DEFAULT_PORT, SLEEP_MODE, FORCED_MODE, NORMAL_MODE, \
+    oversampling, filter_coefficient, standby_time, calibration_cache, \
+    compensate_float, wait_sleep, reset, _calc_delay, _calibration, \
+    _channels, _check_calibration, _config, _read
+
+
+class BME280(object):
+    """
+    A sensor at a given address on a bus, along with its calibration and
+    configuration. The configuration attributes (``sampling``, ``t_sampling``,
+    ``h_sampling``, ``p_sampling``, ``mode``, ``standby`` and ``iir_filter``)
+    can be changed at any time, and are
+    applied on the next call to :py:meth:`sample`: the device remembers
+    what it last wrote to each register, so registers are only written when
+    their value actually changes.
+
+    In forced mode, this means that taking a sample costs a single register
+    write (to trigger the conversion) and a burst read; in normal mode, just
+    the burst read.
+
+    :param t_sampling: temperature oversampling, if different to ``sampling``.
+    :param h_sampling: humidity oversampling, if different to ``sampling``, or
+        ``oversampling.skip`` to not measure humidity.
+    :param p_sampling: pressure oversampling, if different to ``sampling``, or
+        ``oversampling.skip`` to not measure pressure.
+    :param standby: the standby time between measurements in normal mode, one
+        of the ``bme280.standby_time`` constants.
+    :param iir_filter: the IIR filter coefficient, one of the
+        ``bme280.filter_coefficient`` constants. The filter is applied by the
+        sensor to pressure and temperature readings.
+    :param compact: if set, readings are returned as
+        :py:class:`bme280.compact_reading` objects.
+    :param engine: the compensation engine, either
+        :py:func:`bme280.compensate_float` or :py:func:`bme280.compensate_int`.
+    :param wait: how to wait for forced mode conversions to complete, either
+        :py:func:`bme280.wait_sleep` or a :py:class:`bme280.StatusPoll`.
+    :param retry: a :py:class:`bme280.Retry` policy to recover from errors
+        talking to the sensor with, rather than raising them.
+    """
+    def __init__(self, bus, address=DEFAULT_PORT, compensation_params=None,
+                 sampling=oversampling.x1, mode=FORCED_MODE,
+                 standby=standby_time.ms_0_5, iir_filter=filter_coefficient.off,
+                 compact=False, engine=compensate_float, wait=wait_sleep,
+                 t_sampling=None, h_sampling=None, p_sampling=None, retry=None):
+        self.bus = bus
+        self.address = address
+        self._cached = compensation_params is None
+        if compensation_params is None:
+            self.calibration = calibration_cache(bus, address)
+        else:
+            self.calibration = _calibration(compensation_params)
+
+        self.sampling = sampling
+        self.t_sampling = t_sampling
+        self.h_sampling = h_sampling
+        self.p_sampling = p_sampling
+        self.mode = mode
+        self.standby = standby
+        self.iir_filter = iir_filter
+        self.compact = compact
+        self.engine = engine
+        self.wait = wait
+        self.retry = retry
+
+        self._registers = {}
+        self._ready_at = 0
+        self._oversampling = None
+
+    def _forget(self):
+        # The sensor's registers are no longer known
+        self._registers = {}
+        self._ready_at = 0
+
+    def reset(self):
+        """
+        Soft resets the sensor. The configuration is written again on the
+        next call to :py:meth:`sample`, and calibration is replaced if the
+        sensor's :py:func:`bme280.nvm_fingerprint` no longer matches it.
+        """
+        reset(self.bus, self.address)
+        self._forget()
+        comp = _check_calibration(self.bus, self.address, None if self._cached else self.calibration)
+        self.calibration = calibration_cache(self.bus, self.address) if comp is None else comp
+
+    def _write(self, register, value):
+        self.bus.write_byte_data(self.address, register, value)
+        self._registers[register] = value
+
+    def _configure(self):
+        """
+        Writes any registers whose value needs to change, triggering a
+        conversion in forced mode. Returns the (maximum) time to wait before
+        the data registers can be read.
+        """
+        t, h, p = self._oversampling = _channels(self.sampling, self.t_sampling, self.h_sampling, self.p_sampling)
+        config = self.standby << 5 | self.iir_filter << 2
+        ctrl_meas = t << 5 | p << 2 | self.mode
+        stale = False
+
+        if self._registers.get(0xF5) != config:
+            config = _config(self.standby, self.iir_filter)
+            # Writes to the config register may be ignored in normal mode, so
+            # drop into sleep mode first. Before anything has been written,
+            # the sensor may have been left in normal mode by someone else.
+            current = self._registers.get(0xF4, self.mode)
+            if current & 0x03 == NORMAL_MODE:
+                self._write(0xF4, SLEEP_MODE)
+            self._write(0xF5, config)
+            stale = True
+
+        if self._registers.get(0xF2) != h:
+            # Changes to ctrl_hum only take effect after ctrl_meas is written
+            self._write(0xF2, h)
+            stale = True
+
+        if self.mode == FORCED_MODE:
+            self._write(0xF4, ctrl_meas)
+            return _calc_delay(t, h, p)
+
+        if stale or self._registers.get(0xF4) != ctrl_meas:
+            self._write(0xF4, ctrl_meas)
+            # The data registers are not valid until the first measurement
+            # after entering normal mode has completed
+            self._ready_at = time.monotonic() + _calc_delay(t, h, p)
+
+        return self._ready_at - time.monotonic()
+
+    def sample(self):
+        """
+        Takes a reading, returning a compensated reading object.
+        """
+        if self.retry is None:
+            return self._sample(self.calibration)
+        return self.retry(self.bus, self.address, None if self._cached else self.calibration,
+                          self._sample, on_recover=self._forget)
+
+    def _sample(self, calibration):
+        self.calibration = _calibration(calibration)
+        delay = self._configure()
+        if self.mode == FORCED_MODE:
+            self.wait(self.bus, self.address, delay)
+        elif delay > 0:
+            time.sleep(delay)
+        return _read(self.bus, self.address, self.calibration, self.compact, self.engine,
+                     self._oversampling)
+
+    def sleep(self):
+        """
+        Puts the sensor into sleep mode, stopping any normal mode measurements.
+        The configured mode is resumed on the next call to :py:meth:`sample`.
+        """
+        ctrl_meas = self._registers.get(0xF4)
+        if ctrl_meas is not None and ctrl_meas & 0x03 != SLEEP_MODE:
+            self._write(0xF4, ctrl_meas & ~0x03)
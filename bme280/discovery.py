@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Finding sensors: probes I2C buses at both of the addresses a BME280 can
+have, and sets up a :py:class:`bme280.device.BME280` for each one found,
+loading calibration for all of them in parallel.
+"""
+
+import glob
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from bme280 import CHIP_ID
+from bme280.device import BME280
+
+# A BME280 is at 0x76 or 0x77, depending on how its SDO pin is wired
+ADDRESSES = (0x76, 0x77)
+
+
+def bus_numbers(pattern="/dev/i2c-*"):
+    """
+    Returns the numbers of the I2C buses present, in order.
+    """
+    numbers = []
+    for path in glob.glob(pattern):
+        match = re.search(r"(\d+)$", path)
+        if match:
+            numbers.append(int(match.group(1)))
+    return sorted(numbers)
+
+
+def probe(bus, address):
+    """
+    Returns whether there is a BME280 at the given address, checking its id
+    register (0xD0). This takes a single I2C transaction.
+    """
+    try:
+        return bus.read_byte_data(address, 0xD0) == CHIP_ID
+    except OSError:
+        return False
+
+
+def _discover_bus(bus, addresses, kwargs):
+    devices = []
+    for address in addresses:
+        if probe(bus, address):
+            try:
+                devices.append(BME280(bus, address, **kwargs))
+            except OSError:
+                # Gone away while loading calibration
+                pass
+    return devices
+
+
+def discover(buses=None, addresses=ADDRESSES, open_bus=None, **kwargs):
+    """
+    Probes the given buses for sensors, and returns a list of
+    :py:class:`bme280.device.BME280` devices, ready to sample, for those
+    found (ordered by bus, then address). Each bus is probed, and the
+    calibration of its sensors loaded, in its own thread.
+
+    :param buses: a list of bus numbers or SMBus instances, defaults to all
+        the ``/dev/i2c-*`` buses.
+    :param open_bus: opens a bus given its number, defaults to
+        ``smbus2.SMBus``. Buses opened here are closed again if no sensors
+        are found on them.
+    :param kwargs: any other arguments are passed to the devices.
+    """
+    if buses is None:
+        buses = bus_numbers()
+
+    # (bus, whether it was opened here)
+    candidates = []
+    for bus in buses:
+        if isinstance(bus, int):
+            if open_bus is None:
+                from smbus2 import SMBus as open_bus
+            try:
+                candidates.append((open_bus(bus), True))
+            except OSError:
+                pass
+        else:
+            candidates.append((bus, False))
+
+    if not candidates:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+        found = list(executor.map(lambda bus: _discover_bus(bus, addresses, kwargs),
+                                  [bus for bus, _ in candidates]))
+
+    devices = []
+    for (bus, opened), bus_devices in zip(candidates, found):
+        if opened and not bus_devices:
+            bus.close()
+        devices.extend(bus_devices)
+    return devices
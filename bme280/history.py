@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import math
+from array import array
+
+CHANNELS = ("temperature", "pressure", "humidity")
+
+
+class _monotonic_queue(object):
+    """
+    Sequence numbers of the values in the window which could still become its
+    minimum (or maximum), kept in a fixed size ring: the value at the head is
+    the current minimum (or maximum).
+    """
+    __slots__ = ("_seqs", "_head", "_size", "_capacity", "_values", "_sign")
+
+    def __init__(self, values, capacity, sign):
+        self._seqs = array("q", [0]) * capacity
+        self._head = 0
+        self._size = 0
+        self._capacity = capacity
+        self._values = values
+        self._sign = sign
+
+    def push(self, seq, value):
+        capacity = self._capacity
+        values = self._values
+        sign = self._sign
+
+        # Drop the oldest if it has fallen out of the window
+        if self._size and self._seqs[self._head] <= seq - capacity:
+            self._head = (self._head + 1) % capacity
+            self._size -= 1
+
+        # Drop any values that can never be the minimum (or maximum) now
+        while self._size:
+            tail = self._seqs[(self._head + self._size - 1) % capacity]
+            if sign * values[tail % capacity] < sign * value:
+                break
+            self._size -= 1
+
+        self._seqs[(self._head + self._size) % capacity] = seq
+        self._size += 1
+
+    def peek(self):
+        return self._values[self._seqs[self._head] % self._capacity]
+
+
+class _channel(object):
+    __slots__ = ("values", "mean", "m2", "min", "max")
+
+    def __init__(self, capacity):
+        self.values = array("d", [0.0]) * capacity
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = _monotonic_queue(self.values, capacity, 1)
+        self.max = _monotonic_queue(self.values, capacity, -1)
+
+
+class History(object):
+    """
+    Fixed capacity store of the most recent readings from a sensor, with
+    rolling statistics. Values are kept in preallocated arrays rather than
+    as reading objects, and the mean, variance, minimum and maximum are
+    maintained incrementally as readings are added, so adding a reading and
+    querying the statistics both take constant time.
+
+    A :py:class:`bme280.sampler.Sampler` can feed a history directly, for
+    example::
+
+        history = History(600)
+        sampler = Sampler(bus, 0x76, history=history)
+
+    :param capacity: the number of readings to keep.
+    :param channels: which of ``temperature``, ``pressure`` and ``humidity``
+        to record (default: all three).
+    """
+    def __init__(self, capacity, channels=CHANNELS):
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        for name in channels:
+            if name not in CHANNELS:
+                raise ValueError("Unknown channel: {0}".format(name))
+
+        self.capacity = capacity
+        self.channels = tuple(channels)
+        self._epochs = array("d", [0.0]) * capacity
+        self._channels = {name: _channel(capacity) for name in self.channels}
+        self._seq = 0
+
+    def __len__(self):
+        return min(self._seq, self.capacity)
+
+    def append(self, reading):
+        """
+        Adds a compensated reading, replacing the oldest if at capacity.
+        """
+        self.add(reading.epoch, *[getattr(reading, name) for name in self.channels])
+
+    def add(self, epoch, *values):
+        """
+        Adds a reading given as seconds since the epoch and a value for each
+        of the recorded channels, in order. Raises ``ValueError`` if any of
+        them is ``None``, as it is for channels the sensor skipped: leave
+        those out of the history's ``channels``.
+        """
+        for name, x in zip(self.channels, values):
+            if x is None:
+                raise ValueError("No {0} value: skipped channels can't be recorded, "
+                                 "see History(channels=...)".format(name))
+
+        seq = self._seq
+        capacity = self.capacity
+        i = seq % capacity
+        full = seq >= capacity
+        n = capacity if full else seq + 1
+
+        self._epochs[i] = epoch
+        for name, x in zip(self.channels, values):
+            channel = self._channels[name]
+            if full:
+                # Welford's update, replacing the oldest value with the newest
+                y = channel.values[i]
+                mean = channel.mean
+                channel.mean = mean + (x - y) / n
+                channel.m2 += (x - y) * (x - channel.mean + y - mean)
+            else:
+                delta = x - channel.mean
+                channel.mean += delta / n
+                channel.m2 += delta * (x - channel.mean)
+
+            channel.values[i] = x
+            channel.min.push(seq, x)
+            channel.max.push(seq, x)
+
+        self._seq = seq + 1
+
+    def _channel(self, name):
+        if not self._seq:
+            raise ValueError("History is empty")
+        return self._channels[name]
+
+    def mean(self, channel):
+        return self._channel(channel).mean
+
+    def variance(self, channel):
+        """
+        Population variance of the channel's values.
+        """
+        return max(self._channel(channel).m2 / len(self), 0.0)
+
+    def stdev(self, channel):
+        return math.sqrt(self.variance(channel))
+
+    def min(self, channel):
+        return self._channel(channel).min.peek()
+
+    def max(self, channel):
+        return self._channel(channel).max.peek()
+
+    def latest(self, channel):
+        return self._channel(channel).values[(self._seq - 1) % self.capacity]
+
+    def trend(self, channel):
+        """
+        Rate of change of the channel (per second) between the oldest and
+        latest readings, e.g. to tell whether the pressure is rising or
+        falling.
+        """
+        values = self._channel(channel).values
+        newest = (self._seq - 1) % self.capacity
+        oldest = (self._seq - len(self)) % self.capacity
+        elapsed = self._epochs[newest] - self._epochs[oldest]
+        return (values[newest] - values[oldest]) / elapsed if elapsed else 0.0
+
+    def _ordered(self, values):
+        start = self._seq % self.capacity if self._seq >= self.capacity else 0
+        return values[start:len(self)] + values[:start] if start else values[:len(self)]
+
+    def epochs(self):
+        """
+        Returns the times of the readings, oldest first, as an ``array('d')``.
+        """
+        return self._ordered(self._epochs)
+
+    def values(self, channel):
+        """
+        Returns the channel's values, oldest first, as an ``array('d')``.
+        """
+        return self._ordered(self._channels[channel].values)
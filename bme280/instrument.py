@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Optional instrumentation, to see where the time in sampling goes. Nothing
+here is used unless asked for: wrap the bus, completion strategy and
+compensation engine passed to :py:func:`bme280.sample` (or a device) with
+those from a :py:class:`Metrics` object, and they count I2C transactions and
+bytes, and record how long the bus, conversion wait and compensation take.
+"""
+
+import bisect
+import threading
+import time
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.00001, 0.00002, 0.00005, 0.0001, 0.0002, 0.0005,
+           0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0,
+           float("inf"))
+
+
+class Histogram(object):
+    """
+    Counts of durations (in seconds) falling into each of the ``BUCKETS``,
+    along with their total and number.
+    """
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        Returns a list of ``(bound, count)`` tuples, with the count of
+        durations less than or equal to each bucket bound, as used by
+        Prometheus.
+        """
+        total = 0
+        result = []
+        for bound, count in zip(BUCKETS, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Metrics(object):
+    """
+    Collects I2C transaction and byte counts by ``(bus, address)``, and
+    histograms of:
+
+      * ``read``: time taken by bus reads
+      * ``write``: time taken by bus writes
+      * ``conversion_wait``: time spent waiting for conversions to complete
+      * ``compute``: time spent compensating raw readings
+
+    The byte counts are of the data transferred, not including addresses and
+    register numbers. Metrics may be shared between threads.
+    """
+    HISTOGRAMS = ("read", "write", "conversion_wait", "compute")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.transactions = {}
+            self.bytes = {}
+            self.histograms = {name: Histogram() for name in self.HISTOGRAMS}
+
+    def _record(self, name, key, length, duration):
+        with self._lock:
+            self.transactions[key] = self.transactions.get(key, 0) + 1
+            self.bytes[key] = self.bytes.get(key, 0) + length
+            self.histograms[name].observe(duration)
+
+    def _observe(self, name, duration):
+        with self._lock:
+            self.histograms[name].observe(duration)
+
+    def bus(self, bus, name=None):
+        """
+        Returns an :py:class:`InstrumentedBus` wrapping the given bus. Counts
+        are keyed by ``name`` if given, otherwise by the bus itself.
+        """
+        return InstrumentedBus(bus, self, name)
+
+    def wait(self, wait):
+        """
+        Wraps a completion strategy (such as :py:func:`bme280.wait_sleep` or
+        a :py:class:`bme280.StatusPoll`) to record the time it takes.
+        """
+        def timed_wait(bus, address, timeout):
+            start = time.perf_counter()
+            try:
+                return wait(bus, address, timeout)
+            finally:
+                self._observe("conversion_wait", time.perf_counter() - start)
+        return timed_wait
+
+    def engine(self, engine):
+        """
+        Wraps a compensation engine (such as
+        :py:func:`bme280.compensate_float`) to record the time it takes.
+        """
+        def timed_engine(raw_readings, compensation_params):
+            start = time.perf_counter()
+            try:
+                return engine(raw_readings, compensation_params)
+            finally:
+                self._observe("compute", time.perf_counter() - start)
+        return timed_engine
+
+    def snapshot(self):
+        """
+        Returns a copy of the metrics as a dictionary, suitable for exporting
+        to a metrics system.
+        """
+        with self._lock:
+            return {
+                "transactions": dict(self.transactions),
+                "bytes": dict(self.bytes),
+                "histograms": {name: {"buckets": h.cumulative(), "count": h.count, "sum": h.sum}
+                               for name, h in self.histograms.items()}
+            }
+
+
+class InstrumentedBus(object):
+    """
+    Proxy for an SMBus instance which records each transaction in a
+    :py:class:`Metrics` object. Other attributes are passed through to the
+    wrapped bus.
+    """
+    def __init__(self, bus, metrics, name=None):
+        self._bus = bus
+        self._metrics = metrics
+        self._name = bus if name is None else name
+
+    def _call(self, kind, fn, address, length, *args):
+        start = time.perf_counter()
+        try:
+            return fn(address, *args)
+        finally:
+            self._metrics._record(kind, (self._name, address), length, time.perf_counter() - start)
+
+    def read_byte_data(self, i2c_addr, register, *args):
+        return self._call("read", self._bus.read_byte_data, i2c_addr, 1, register, *args)
+
+    def read_word_data(self, i2c_addr, register, *args):
+        return self._call("read", self._bus.read_word_data, i2c_addr, 2, register, *args)
+
+    def read_i2c_block_data(self, i2c_addr, register, length, *args):
+        return self._call("read", self._bus.read_i2c_block_data, i2c_addr, length, register, length, *args)
+
+    def write_byte_data(self, i2c_addr, register, value, *args):
+        return self._call("write", self._bus.write_byte_data, i2c_addr, 1, register, value, *args)
+
+    def write_i2c_block_data(self, i2c_addr, register, data, *args):
+        return self._call("write", self._bus.write_i2c_block_data, i2c_addr, len(data), register, data, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._bus, name)
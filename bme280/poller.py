@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from bme280 import DEFAULT_PORT, oversampling, calibration_cache, \
+    _calibration, _channels, _trigger, _read
+
+
+class MultiSensorPoller(object):
+    """
+    Samples many sensors in one cycle. On each bus, conversions are triggered
+    on every registered address first, then there is a single wait for the
+    slowest one to complete before they are all read back. Each bus is
+    driven from its own thread (holding a per-bus lock for the duration of
+    the cycle), so the time taken for a cycle is roughly that of a single
+    conversion, no matter how many sensors or buses are registered.
+
+    If ``compact`` is set, readings are returned as
+    :py:class:`bme280.compact_reading` objects.
+    """
+    def __init__(self, sampling=oversampling.x1, compact=False):
+        self._sampling = sampling
+        self._compact = compact
+        self._sensors = OrderedDict()
+        self._locks = {}
+        self._executor = None
+        self._workers = 0
+        self.errors = OrderedDict()
+
+    def register(self, bus, address=DEFAULT_PORT, compensation_params=None, sampling=None):
+        """
+        Adds a sensor to the poller. If no compensation params are given, they
+        are loaded (and cached) here rather than on the first poll.
+        """
+        if compensation_params is None:
+            compensation_params = calibration_cache(bus, address)
+        else:
+            compensation_params = _calibration(compensation_params)
+
+        if bus not in self._sensors:
+            self._sensors[bus] = OrderedDict()
+            self._locks[bus] = threading.Lock()
+
+        self._sensors[bus][address] = (compensation_params, _channels(self._sampling if sampling is None else sampling))
+        return self
+
+    def unregister(self, bus, address=DEFAULT_PORT):
+        """
+        Removes a previously registered sensor from the poller.
+        """
+        del self._sensors[bus][address]
+        if not self._sensors[bus]:
+            del self._sensors[bus]
+            del self._locks[bus]
+
+    def _poll_bus(self, bus):
+        # An error from one sensor takes its place in the results, rather
+        # than losing the readings from every other sensor
+        sensors = self._sensors[bus]
+        results = OrderedDict()
+        with self._locks[bus]:
+            delay = 0
+            for address, (_, channels) in sensors.items():
+                try:
+                    delay = max(delay, _trigger(bus, address, channels))
+                except OSError as e:
+                    results[bus, address] = e
+            time.sleep(delay)
+
+            for address, (compensation_params, channels) in sensors.items():
+                if (bus, address) in results:
+                    continue
+                try:
+                    results[bus, address] = _read(bus, address, compensation_params, self._compact,
+                                                  channels=channels)
+                except OSError as e:
+                    results[bus, address] = e
+        return [((bus, address), results[bus, address]) for address in sensors]
+
+    def poll(self):
+        """
+        Takes a reading from every registered sensor, returning a dictionary
+        of compensated readings keyed by ``(bus, address)``.
+
+        A sensor which fails with an ``OSError`` does not stop the others
+        being read: its reading is ``None``, and the error is kept in
+        :py:attr:`errors` (which only holds the errors from the latest poll).
+        """
+        buses = list(self._sensors)
+        if len(buses) <= 1:
+            return self._results(reading for bus in buses for reading in self._poll_bus(bus))
+
+        if self._workers < len(buses):
+            # One thread per bus, so that no bus waits on another
+            self.close()
+            self._executor = ThreadPoolExecutor(max_workers=len(buses))
+            self._workers = len(buses)
+
+        return self._results(reading for readings in self._executor.map(self._poll_bus, buses)
+                             for reading in readings)
+
+    def _results(self, readings):
+        results = OrderedDict()
+        errors = OrderedDict()
+        for key, reading in readings:
+            if isinstance(reading, OSError):
+                errors[key] = reading
+                reading = None
+            results[key] = reading
+        self.errors = errors
+        return results
+
+    def close(self):
+        """
+        Shuts down the worker threads.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._workers = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
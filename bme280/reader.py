@@ -30,7 +30,7 @@
 class reader(object):
     """
     Wraps a I2C SMBus instance to provide methods for reading
-    signed/unsigned bytes and 16-bit words
+    signed/unsigned bytes, 16-bit words and contiguous blocks of registers
     """
     def __init__(self, bus, address):
         self._bus = bus
@@ -49,3 +49,6 @@ class reader(object):
     def signed_byte(self, register):
         byte = self.unsigned_byte(register) & 0xff
         return byte if byte < 0x80 else byte - 0x100
+
+    def block(self, register, length):
+        return bytes(self._bus.read_i2c_block_data(self._address, register, length))
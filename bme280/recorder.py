@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Compact binary log of raw sensor data. A log file starts with a header
+holding the calibration params of each sensor, followed by fixed width
+records of the time, sensor address and the eight raw data registers, so
+readings can be recompensated later (and quickly: files are memory mapped
+on replay, and can be compensated in bulk with NumPy).
+"""
+
+import mmap
+import os
+import struct
+import time
+
+from bme280 import Calibration, compact_reading, compensate_float, params, \
+    uncompensated_readings
+
+MAGIC = b"BME280LG"
+VERSION = 1
+
+_header = struct.Struct("<8sHH")
+_calibration = struct.Struct("<BHhhHhhhhhhhhBhbhhb")
+_record = struct.Struct("<dB8s")
+_record_header = struct.Struct("<dB")
+
+_param_names = ("dig_T1", "dig_T2", "dig_T3",
+                "dig_P1", "dig_P2", "dig_P3", "dig_P4", "dig_P5",
+                "dig_P6", "dig_P7", "dig_P8", "dig_P9",
+                "dig_H1", "dig_H2", "dig_H3", "dig_H4", "dig_H5", "dig_H6")
+
+
+def _encode_header(calibrations):
+    parts = [_header.pack(MAGIC, VERSION, len(calibrations))]
+    for address in sorted(calibrations):
+        comp = calibrations[address]
+        parts.append(_calibration.pack(address, *[getattr(comp, name) for name in _param_names]))
+    return b"".join(parts)
+
+
+def _decode_header(buf):
+    if len(buf) < _header.size:
+        raise ValueError("Not a BME280 log: too short")
+    magic, version, count = _header.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError("Not a BME280 log: bad magic")
+    if version != VERSION:
+        raise ValueError("Unsupported BME280 log version: {0}".format(version))
+
+    calibrations = {}
+    offset = _header.size
+    for _ in range(count):
+        values = _calibration.unpack_from(buf, offset)
+        calibrations[values[0]] = params(zip(_param_names, values[1:]))
+        offset += _calibration.size
+    return calibrations, offset
+
+
+class Recorder(object):
+    """
+    Appends raw data register blocks to a binary log file. A new file is
+    started with a header holding the given calibration params; appending to
+    an existing file requires the same calibration params as it was started
+    with.
+
+    :param calibrations: a dictionary of compensation params (or
+        :py:class:`bme280.Calibration` objects) keyed by sensor address.
+    """
+    def __init__(self, path, calibrations):
+        header = _encode_header(calibrations)
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(header)
+        else:
+            with open(path, "rb") as f:
+                existing = f.read(len(header))
+            if existing != header:
+                self._file.close()
+                raise ValueError("{0} was recorded with different calibration params".format(path))
+
+    def record(self, address, block, epoch=None):
+        """
+        Appends a record of the eight data registers (0xF7-0xFE) read from
+        the sensor at the given address, timestamped now unless ``epoch``
+        (seconds since the epoch) is given.
+        """
+        if len(block) != 8:
+            raise ValueError("Expected all eight data registers, got {0}".format(len(block)))
+        self._file.write(_record.pack(time.time() if epoch is None else epoch, address, bytes(block)))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Replay(object):
+    """
+    Reads back a log written by a :py:class:`Recorder`. The file is memory
+    mapped rather than read into memory, and records are decoded on demand.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        self.calibrations, self._offset = _decode_header(self._mmap)
+        self._count = (len(self._mmap) - self._offset) // _record.size
+
+    def __len__(self):
+        return self._count
+
+    def records(self):
+        """
+        Yields an ``(epoch, address, block)`` tuple for each record.
+        """
+        buf = memoryview(self._mmap)
+        try:
+            for values in _record.iter_unpack(buf[self._offset:self._offset + self._count * _record.size]):
+                yield values
+        finally:
+            buf.release()
+
+    def readings(self, engine=compensate_float):
+        """
+        Yields an ``(address, reading)`` tuple for each record, compensated
+        with the given engine. Each reading is a
+        :py:class:`bme280.compact_reading` with its original time.
+        """
+        calibrations = {address: Calibration(comp) for address, comp in self.calibrations.items()}
+        buf = self._mmap
+        for offset in range(self._offset, self._offset + self._count * _record.size, _record.size):
+            epoch, address = _record_header.unpack_from(buf, offset)
+            raw = uncompensated_readings.from_buffer(buf, offset + _record_header.size)
+            yield address, compact_reading(*engine(raw, calibrations[address]), epoch=epoch)
+
+    def arrays(self):
+        """
+        Returns NumPy arrays of the times, addresses and (N, 8) raw blocks of
+        all the records, as views onto the memory mapped file (so they must be
+        released before the replay is closed).
+        """
+        import numpy as np
+
+        dtype = np.dtype([("epoch", "<f8"), ("address", "u1"), ("block", "u1", (8,))])
+        records = np.frombuffer(self._mmap, dtype=dtype, count=self._count, offset=self._offset)
+        return records["epoch"], records["address"], records["block"]
+
+    def compensate_batch(self, address):
+        """
+        Compensates all the records for the sensor at the given address in one
+        go, using :py:func:`bme280.batch.compensate_batch`. Returns a tuple of
+        arrays: times, temperature, pressure and humidity.
+        """
+        from bme280.batch import compensate_batch
+
+        epochs, addresses, blocks = self.arrays()
+        selected = addresses == address
+        return (epochs[selected],) + compensate_batch(blocks[selected], self.calibrations[address])
+
+    def close(self):
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import time
+
+from bme280 import DEFAULT_PORT, NORMAL_MODE, STANDBY_TIMES, oversampling, \
+    filter_coefficient, standby_time, compensate_float, _calc_delay, \
+    _channels, _config
+from bme280.device import BME280
+
+
+class Sampler(object):
+    """
+    Streams readings from a sensor running in normal mode: the control and
+    config registers are written once, after which the sensor cycles between
+    measuring and standby on its own, and each reading is just a burst read
+    of the data registers.
+
+    The sensor is driven through a :py:class:`bme280.device.BME280` in normal
+    mode, available as ``device``, and the arguments not listed here are
+    passed on to it.
+
+    :param standby: the standby time between measurements, one of the
+        ``bme280.standby_time`` constants.
+    :param iir_filter: the IIR filter coefficient, one of the
+        ``bme280.filter_coefficient`` constants.
+    :param compact: if set, readings are returned as
+        :py:class:`bme280.compact_reading` objects.
+    :param history: a :py:class:`bme280.history.History` to add every reading
+        to.
+    """
+    def __init__(self, bus, address=DEFAULT_PORT, compensation_params=None,
+                 sampling=oversampling.x1, standby=standby_time.ms_0_5,
+                 iir_filter=filter_coefficient.off, compact=False, history=None,
+                 engine=compensate_float, t_sampling=None, h_sampling=None,
+                 p_sampling=None, retry=None):
+        # Fail early rather than on start()
+        _config(standby, iir_filter)
+        _channels(sampling, t_sampling, h_sampling, p_sampling)
+
+        self.device = BME280(bus, address, compensation_params, sampling=sampling,
+                             mode=NORMAL_MODE, standby=standby, iir_filter=iir_filter,
+                             compact=compact, engine=engine, t_sampling=t_sampling,
+                             h_sampling=h_sampling, p_sampling=p_sampling, retry=retry)
+        self._history = history
+        self._started = False
+
+    @property
+    def period(self):
+        """
+        Time in seconds between successive measurements.
+        """
+        d = self.device
+        channels = _channels(d.sampling, d.t_sampling, d.h_sampling, d.p_sampling)
+        return _calc_delay(*channels) + STANDBY_TIMES[d.standby]
+
+    def start(self):
+        """
+        Configures the sensor and puts it into normal mode.
+        """
+        self.device._configure()
+        self._started = True
+        return self
+
+    def stop(self):
+        """
+        Returns the sensor to sleep mode.
+        """
+        self.device.sleep()
+        self._started = False
+
+    def read(self):
+        """
+        Returns a compensated reading of the most recently completed
+        measurement. The sensor must have been started.
+        """
+        if not self._started:
+            raise RuntimeError("Sampler has not been started")
+
+        reading = self.device.sample()
+        if self._history is not None:
+            self._history.append(reading)
+        return reading
+
+    def __iter__(self):
+        if not self._started:
+            self.start()
+
+        period = self.period
+        due = time.monotonic()
+        while True:
+            yield self.read()
+            due += period
+            pause = due - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2016 Richard Hull
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+A simulated BME280 on a simulated I2C bus, for testing and benchmarking
+without hardware. The sensor has a register map with real calibration NVM,
+converts readings from an environment model with the datasheet's typical
+measurement times, and the bus charges each transaction the time it would
+take at the given I2C clock speed.
+"""
+
+import errno
+import os
+import random
+import time
+
+from bme280 import CHIP_ID, DEFAULT_PORT, SLEEP_MODE, NORMAL_MODE, \
+    STANDBY_TIMES, Calibration, params, _nvm_blocks
+
+# Calibration NVM of a real sensor
+CALIBRATION = params(
+    dig_T1=28181, dig_T2=26700, dig_T3=50,
+    dig_P1=37833, dig_P2=-10624, dig_P3=3024, dig_P4=7696, dig_P5=-113,
+    dig_P6=-7, dig_P7=9900, dig_P8=-10230, dig_P9=4285,
+    dig_H1=75, dig_H2=362, dig_H3=0, dig_H4=323, dig_H5=50, dig_H6=30)
+
+# Time to copy the NVM to the image registers after a reset (the datasheet's
+# start-up time)
+_STARTUP_TIME = 0.002
+
+
+def _invert(f, target, maximum):
+    # Bisects for the ADC value whose compensated value is closest to the
+    # target; the compensation formulas are monotonic over the ADC range
+    lo, hi = 0, maximum
+    increasing = f(hi) > f(lo)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (f(mid) < target) == increasing:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo and abs(f(lo - 1) - target) < abs(f(lo) - target):
+        return lo - 1
+    return lo
+
+
+def _count(oversampling):
+    # Number of samples taken for an oversampling setting
+    return 0 if not oversampling else 1 << (min(oversampling, 5) - 1)
+
+
+def _measurement_time(t, h, p):
+    # Typical measurement time, see section 9.1 of the datasheet
+    t_time = 0.001 + 0.002 * _count(t)
+    h_time = 0.0005 + 0.002 * _count(h) if h else 0
+    p_time = 0.0005 + 0.002 * _count(p) if p else 0
+    return t_time + h_time + p_time
+
+
+class Environment(object):
+    """
+    A simple environment model: constant temperature (°C), pressure (hPa)
+    and relative humidity (%), optionally with gaussian noise of the given
+    standard deviation added to each. Any callable taking the time in
+    seconds since the sensor was created, and returning a (temperature,
+    pressure, humidity) tuple, can be used as a model instead.
+    """
+    def __init__(self, temperature=20.0, pressure=1013.25, humidity=45.0, noise=0.0, seed=None):
+        self.temperature = temperature
+        self.pressure = pressure
+        self.humidity = humidity
+        self.noise = noise
+        self._random = random.Random(seed)
+
+    def __call__(self, elapsed):
+        values = (self.temperature, self.pressure, self.humidity)
+        if self.noise:
+            values = tuple(value + self._random.gauss(0.0, self.noise) for value in values)
+        return values
+
+
+class SimulatedBME280(object):
+    """
+    Register level model of a BME280. Forced and normal modes, the status
+    register, soft reset, oversampling (including the resolution it gives)
+    and the IIR filter are simulated; measurements complete after the
+    datasheet's typical measurement time.
+
+    :param calibration: the compensation params held in the NVM, defaults to
+        those of a real sensor.
+    :param environment: a callable returning the (temperature, pressure,
+        humidity) to be measured, see :py:class:`Environment`.
+    """
+    def __init__(self, calibration=CALIBRATION, environment=None):
+        self.environment = environment or Environment()
+        self._comp = Calibration(calibration)
+        self._nvm = _nvm_blocks(calibration)
+        self._created = time.monotonic()
+        self._adc_cache = (None, None)
+        self.reset()
+
+    def reset(self):
+        """
+        Returns all registers to their power-on values.
+        """
+        registers = bytearray(256)
+        block_1, block_2 = self._nvm
+        registers[0x88:0x88 + len(block_1)] = block_1
+        registers[0xE1:0xE1 + len(block_2)] = block_2
+        registers[0xD0] = CHIP_ID
+        registers[0xF7:0xFF] = b"\x80\x00\x00\x80\x00\x00\x80\x00"
+        self._registers = registers
+
+        self._osrs_h = 0
+        self._converting_until = None
+        self._normal_since = None
+        self._cycles = 0
+        self._filtered = None
+        self._im_update_until = time.monotonic() + _STARTUP_TIME
+
+    def _oversampling(self):
+        ctrl_meas = self._registers[0xF4]
+        return ctrl_meas >> 5, self._osrs_h, (ctrl_meas >> 2) & 0x07
+
+    def _adc(self, temperature, pressure, humidity):
+        key = (temperature, pressure, humidity)
+        if self._adc_cache[0] != key:
+            comp = self._comp
+            adc_t = _invert(lambda adc: comp.compensate(adc, None, None)[0], temperature, 0xFFFFF)
+            adc_p = _invert(lambda adc: comp.compensate(adc_t, adc, None)[1], pressure, 0xFFFFF)
+            adc_h = _invert(lambda adc: comp.compensate(adc_t, None, adc)[2], humidity, 0xFFFF)
+            self._adc_cache = (key, (adc_t, adc_p, adc_h))
+        return self._adc_cache[1]
+
+    def _measure(self, now):
+        t, h, p = self._oversampling()
+        adc_t, adc_p, adc_h = self._adc(*self.environment(now - self._created))
+        iir_filter = (self._registers[0xF5] >> 2) & 0x07
+
+        if iir_filter:
+            # The filter also gives 20-bit resolution
+            coefficient = 1 << min(iir_filter, 4)
+            if self._filtered is not None:
+                adc_t = (self._filtered[0] * (coefficient - 1) + adc_t) // coefficient
+                adc_p = (self._filtered[1] * (coefficient - 1) + adc_p) // coefficient
+            self._filtered = (adc_t, adc_p)
+        else:
+            # Each step of oversampling adds a bit of resolution, from 16 bits
+            adc_t &= ~((1 << (5 - min(t, 5))) - 1)
+            adc_p &= ~((1 << (5 - min(p, 5))) - 1)
+
+        # Skipped channels read as 0x80000 (0x8000 for humidity)
+        data = self._registers
+        data[0xF7:0xFA] = (adc_p << 4).to_bytes(3, "big") if p else b"\x80\x00\x00"
+        data[0xFA:0xFD] = (adc_t << 4).to_bytes(3, "big") if t else b"\x80\x00\x00"
+        data[0xFD:0xFF] = adc_h.to_bytes(2, "big") if h else b"\x80\x00"
+
+    def _update(self, now):
+        if self._converting_until is not None and now >= self._converting_until:
+            self._measure(self._converting_until)
+            self._converting_until = None
+            self._registers[0xF4] &= ~0x03  # back to sleep mode
+
+        if self._normal_since is not None:
+            measurement = _measurement_time(*self._oversampling())
+            period = measurement + STANDBY_TIMES[self._registers[0xF5] >> 5]
+            elapsed = now - self._normal_since
+            cycles = int((elapsed - measurement) // period) + 1 if elapsed >= measurement else 0
+            if cycles > self._cycles:
+                self._cycles = cycles
+                self._measure(now)
+
+    def _status(self, now):
+        status = 0
+        if self._converting_until is not None:
+            status |= 0x08
+        elif self._normal_since is not None:
+            measurement = _measurement_time(*self._oversampling())
+            period = measurement + STANDBY_TIMES[self._registers[0xF5] >> 5]
+            if (now - self._normal_since) % period < measurement:
+                status |= 0x08
+        if now < self._im_update_until:
+            status |= 0x01
+        return status
+
+    def read(self, register, length=1):
+        """
+        Reads ``length`` registers from ``register`` onwards, as a burst read
+        does (all registers are read from the same measurement).
+        """
+        now = time.monotonic()
+        self._update(now)
+        self._registers[0xF3] = self._status(now)
+        return bytes(self._registers[register:register + length])
+
+    def write(self, register, value):
+        """
+        Writes a register. Read only registers are left unchanged, as are
+        writes to the config register in normal mode, which the datasheet
+        says may be ignored.
+        """
+        now = time.monotonic()
+        self._update(now)
+        value &= 0xFF
+
+        if register == 0xE0:
+            if value == 0xB6:
+                self.reset()
+        elif register == 0xF2:
+            self._registers[0xF2] = value & 0x07
+        elif register == 0xF5:
+            if self._normal_since is None:
+                self._registers[0xF5] = value & 0xFD
+        elif register == 0xF4:
+            # Changes to ctrl_hum only take effect after writing ctrl_meas
+            self._registers[0xF4] = value
+            self._osrs_h = self._registers[0xF2]
+            self._converting_until = None
+            self._normal_since = None
+            mode = value & 0x03
+            if mode == NORMAL_MODE:
+                self._normal_since = now
+                self._cycles = 0
+            elif mode != SLEEP_MODE:
+                self._converting_until = now + _measurement_time(*self._oversampling())
+
+
+class SimulatedBus(object):
+    """
+    A stand-in for an ``smbus2.SMBus`` with simulated sensors attached.
+    Each transaction takes the time needed to clock its bytes (nine bits
+    each, including the acknowledge) at ``clock_hz``, plus ``overhead``
+    seconds for the adapter and system call. Addresses with no sensor raise
+    ``OSError``, as a real bus does.
+
+    :param devices: a dictionary of :py:class:`SimulatedBME280` by address,
+        defaults to a single sensor at ``bme280.DEFAULT_PORT``.
+    :param realtime: if set, transactions take the simulated time to
+        complete; otherwise it is just added up in ``bus_time``.
+    :param block_reads: if not set, block reads fail as they do on some
+        adapters.
+    """
+    def __init__(self, devices=None, clock_hz=100000, overhead=0.0001,
+                 realtime=True, block_reads=True):
+        self.devices = {DEFAULT_PORT: SimulatedBME280()} if devices is None else devices
+        self.clock_hz = clock_hz
+        self.overhead = overhead
+        self.realtime = realtime
+        self.block_reads = block_reads
+        self.transactions = 0
+        self.bytes_transferred = 0
+        self.bus_time = 0.0
+
+    def _transaction(self, address, length):
+        device = self.devices.get(address)
+        duration = self.overhead + (length * 9 + 2) / self.clock_hz
+        self.transactions += 1
+        self.bytes_transferred += length
+        self.bus_time += duration
+
+        if self.realtime:
+            # Too short for time.sleep to be accurate
+            deadline = time.perf_counter() + duration
+            while time.perf_counter() < deadline:
+                pass
+
+        if device is None:
+            code = getattr(errno, "EREMOTEIO", errno.EIO)
+            raise OSError(code, os.strerror(code))
+        return device
+
+    def read_byte_data(self, i2c_addr, register, force=None):
+        # address + register, then address + one data byte
+        return self._transaction(i2c_addr, 4).read(register)[0]
+
+    def read_word_data(self, i2c_addr, register, force=None):
+        lsb, msb = self._transaction(i2c_addr, 5).read(register, 2)
+        return msb << 8 | lsb
+
+    def read_i2c_block_data(self, i2c_addr, register, length, force=None):
+        if not self.block_reads:
+            raise OSError(errno.EOPNOTSUPP, os.strerror(errno.EOPNOTSUPP))
+        return list(self._transaction(i2c_addr, 3 + length).read(register, length))
+
+    def write_byte_data(self, i2c_addr, register, value, force=None):
+        self._transaction(i2c_addr, 3).write(register, value)
+
+    def reset_stats(self):
+        """
+        Zeroes the transaction, byte and bus time counters.
+        """
+        self.transactions = 0
+        self.bytes_transferred = 0
+        self.bus_time = 0.0
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
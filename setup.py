@@ -21,7 +21,8 @@ needs_pytest = {'pytest', 'test', 'ptr'}.intersection(sys.argv)
 pytest_runner = ['pytest-runner'] if needs_pytest else []
 test_deps = [
     'pytest>=3.1',
-    'pytest-cov'
+    'pytest-cov',
+    'numpy'
 ]
 
 version = _read_version()
@@ -46,6 +47,9 @@ setup(
         'docs': [
             'sphinx>=1.5.1'
         ],
+        'numpy': [
+            'numpy'
+        ],
         'qa': [
             'rstcheck',
             'flake8'
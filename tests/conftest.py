@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+from unittest.mock import Mock, MagicMock
+import bme280
+import pytest
+
+
+@pytest.fixture
+def compensation_params():
+    """
+    Made up calibration params. With a raw block of ``list(range(8))`` they
+    give a temperature of 0.0030482932925224304, pressure of
+    8801790.518824806 and humidity of 0.02082886288568924.
+    """
+    return bme280.params(
+        dig_H1=0, dig_H2=1, dig_H3=4, dig_H4=3, dig_H5=5, dig_H6=6,
+        dig_P1=10, dig_P2=11, dig_P3=12, dig_P4=13, dig_P5=14, dig_P6=15,
+        dig_P7=16, dig_P8=17, dig_P9=18,
+        dig_T1=20, dig_T2=21, dig_T3=22)
+
+
+@pytest.fixture
+def create_bus():
+    """
+    Factory for mock buses, whose burst reads return ``list(range(8))``.
+    """
+    def create_bus():
+        bus = Mock(unsafe=True)
+        bus.write_byte_data = MagicMock()
+        bus.read_i2c_block_data = MagicMock(return_value=list(range(8)))
+        return bus
+    return create_bus
+
+
+@pytest.fixture
+def smbus(create_bus):
+    """
+    A mock bus, as made by :py:func:`create_bus`.
+    """
+    return create_bus()
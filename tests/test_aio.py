@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+import asyncio
+from unittest.mock import call
+from bme280.aio import sample_async, stream_async
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_sample_async(create_bus, compensation_params):
+    bus = create_bus()
+    data = run(sample_async(bus, 0x76, compensation_params))
+
+    assert bus.write_byte_data.call_args_list == [
+        call(0x76, 0xF2, 1),
+        call(0x76, 0xF4, 1 << 5 | 1 << 2 | 1)
+    ]
+    bus.read_i2c_block_data.assert_called_once_with(0x76, 0xF7, 8)
+    assert data.pressure == 8801790.518824806
+    assert data.temperature == 0.0030482932925224304
+    assert data.humidity == 0.02082886288568924
+
+
+def test_sample_async_many_sensors(create_bus, compensation_params):
+    buses = [create_bus() for _ in range(4)]
+
+    async def sample_all():
+        return await asyncio.gather(*[
+            sample_async(bus, address, compensation_params)
+            for bus in buses
+            for address in (0x76, 0x77)])
+
+    readings = run(sample_all())
+    assert len(readings) == 8
+    for bus in buses:
+        assert bus.read_i2c_block_data.call_count == 2
+
+
+def test_sample_async_from_separate_loops(create_bus, compensation_params):
+    bus = create_bus()
+
+    async def sample_both():
+        return await asyncio.gather(sample_async(bus, 0x76, compensation_params),
+                                    sample_async(bus, 0x77, compensation_params))
+
+    for _ in range(2):
+        assert len(run(sample_both())) == 2
+    assert bus.read_i2c_block_data.call_count == 4
+
+
+def test_stream_async(create_bus, compensation_params):
+    bus = create_bus()
+
+    async def take(n):
+        readings = []
+        async for data in stream_async(bus, 0x76, compensation_params, interval=0):
+            readings.append(data)
+            if len(readings) == n:
+                break
+        return readings
+
+    readings = run(take(3))
+    assert len(readings) == 3
+    assert bus.read_i2c_block_data.call_count == 3
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+import random
+import bme280
+import pytest
+
+np = pytest.importorskip("numpy")
+from bme280.batch import compensate_batch, decode_batch  # noqa: E402
+from bme280.simulator import CALIBRATION  # noqa: E402
+
+rnd = random.Random(280)
+blocks = [[rnd.randrange(256) for _ in range(8)] for _ in range(200)]
+
+
+def test_decode_batch():
+    adc = decode_batch(blocks)
+    for row, block in zip(adc, blocks):
+        raw = bme280.uncompensated_readings(block)
+        assert list(row) == [raw.temperature, raw.pressure, raw.humidity]
+
+
+def test_compensate_batch_matches_scalar():
+    temperature, pressure, humidity = compensate_batch(np.array(blocks, dtype=np.uint8), CALIBRATION)
+    for i, block in enumerate(blocks):
+        reading = bme280.compensated_readings(bme280.uncompensated_readings(block), CALIBRATION)
+        assert temperature[i] == reading.temperature
+        assert pressure[i] == reading.pressure
+        assert humidity[i] == reading.humidity
+
+
+def test_compensate_batch_from_adc():
+    adc = decode_batch(blocks)
+    expected = compensate_batch(blocks, CALIBRATION)
+    for actual, wanted in zip(compensate_batch(adc, CALIBRATION), expected):
+        assert np.array_equal(actual, wanted)
+
+
+def test_compensate_batch_divide_by_zero():
+    params = bme280.params(CALIBRATION, dig_P1=0)
+    _, pressure, _ = compensate_batch([[0x80, 0, 0, 0x80, 0, 0, 0x80, 0]], params)
+    assert pressure[0] == 0
+
+
+def test_compensate_batch_bad_shape():
+    with pytest.raises(ValueError):
+        compensate_batch(np.zeros((4, 5)), CALIBRATION)
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+import json
+from bme280.bench import bench_calibration, main
+
+
+def test_calibration_transactions():
+    results = bench_calibration(100000)
+    assert results["load_calibration_params"]["transactions"] == 2
+    assert results["load_calibration_params_by_register"]["transactions"] > 2
+
+
+def test_main_writes_json(tmp_path):
+    output = tmp_path / "bench.json"
+    main(["--iterations", "10", "--samples", "2", "--output", str(output)])
+
+    report = json.loads(output.read_text())
+    results = report["results"]
+    assert results["uncompensated_readings"]["iterations"] == 10
+    assert results["sample"]["readings_per_second"] > 0
+    assert results["sample"]["transactions"] == 3
+    assert "compensated_readings" in results
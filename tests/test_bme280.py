@@ -2,65 +2,73 @@
 # Copyright (c) 2018-2021 Richard Hull
 # See LICENSE.rst for details.
 
-from unittest.mock import Mock, MagicMock
+from unittest.mock import Mock, MagicMock, call
 from datetime import datetime
+import random
+import time
+from bme280.simulator import CALIBRATION, SimulatedBus
 import bme280
+import pytest
 import pytz
 
-smbus = Mock(unsafe=True)
-
-compensation_params = bme280.params()
-compensation_params.dig_H1 = 0
-compensation_params.dig_H2 = 1
-compensation_params.dig_H3 = 4
-compensation_params.dig_H4 = 3
-compensation_params.dig_H5 = 5
-compensation_params.dig_H6 = 6
-compensation_params.dig_P1 = 10
-compensation_params.dig_P2 = 11
-compensation_params.dig_P3 = 12
-compensation_params.dig_P4 = 13
-compensation_params.dig_P5 = 14
-compensation_params.dig_P6 = 15
-compensation_params.dig_P7 = 16
-compensation_params.dig_P8 = 17
-compensation_params.dig_P9 = 18
-compensation_params.dig_T1 = 20
-compensation_params.dig_T2 = 21
-compensation_params.dig_T3 = 22
-
-
-def setup_function(function):
-    smbus.reset_mock()
-
-
-def test_load_calibration_params():
+
+expected_calibration_params = {
+    'dig_H1': 0,
+    'dig_H2': 12,
+    'dig_H3': 1,
+    'dig_H4': 35,
+    'dig_H5': 64,
+    'dig_H6': 5,
+    'dig_P1': 3,
+    'dig_P2': 4,
+    'dig_P3': 5,
+    'dig_P4': 6,
+    'dig_P5': 7,
+    'dig_P6': 8,
+    'dig_P7': 9,
+    'dig_P8': 10,
+    'dig_P9': 11,
+    'dig_T1': 0,
+    'dig_T2': 1,
+    'dig_T3': 2
+}
+
+calibration_blocks = {
+    0x88: [0, 0, 1, 0, 2, 0, 3, 0, 4, 0, 5, 0, 6, 0, 7, 0, 8, 0, 9, 0, 10, 0, 11, 0, 0xFF, 0],
+    0xE1: [12, 0, 1, 2, 3, 4, 5]
+}
+
+
+def read_calibration_block(address, register, length):
+    block = calibration_blocks[register]
+    assert len(block) == length
+    return block
+
+
+def test_load_calibration_params(smbus):
+    smbus.read_i2c_block_data = MagicMock(side_effect=read_calibration_block)
+    calibration_params = bme280.load_calibration_params(bus=smbus, address=0x77)
+    assert calibration_params == expected_calibration_params
+    assert smbus.read_i2c_block_data.call_count == 2
+
+
+def test_load_calibration_params_without_block_reads(smbus):
+    smbus.read_i2c_block_data = MagicMock(side_effect=OSError(95, "Operation not supported"))
     smbus.read_word_data = MagicMock(side_effect=list(range(400)))
     smbus.read_byte_data = MagicMock(side_effect=list(range(400)))
     calibration_params = bme280.load_calibration_params(bus=smbus, address=0x77)
-    assert calibration_params == {
-        'dig_H1': 0,
-        'dig_H2': 12,
-        'dig_H3': 1,
-        'dig_H4': 35,
-        'dig_H5': 64,
-        'dig_H6': 5,
-        'dig_P1': 3,
-        'dig_P2': 4,
-        'dig_P3': 5,
-        'dig_P4': 6,
-        'dig_P5': 7,
-        'dig_P6': 8,
-        'dig_P7': 9,
-        'dig_P8': 10,
-        'dig_P9': 11,
-        'dig_T1': 0,
-        'dig_T2': 1,
-        'dig_T3': 2
-    }
-
-
-def test_sample_with_params():
+    assert calibration_params == expected_calibration_params
+
+
+def test_load_calibration_params_does_not_retry_failed_block_reads(smbus):
+    smbus.read_i2c_block_data = MagicMock(side_effect=OSError(121, "Remote I/O error"))
+    smbus.read_word_data = MagicMock()
+    with pytest.raises(OSError):
+        bme280.load_calibration_params(bus=smbus, address=0x77)
+    smbus.read_word_data.assert_not_called()
+
+
+def test_sample_with_params(smbus, compensation_params):
     smbus.write_byte_data = MagicMock()
     smbus.read_i2c_block_data = MagicMock(return_value=list(range(8)))
 
@@ -72,11 +80,10 @@ def test_sample_with_params():
     assert data.humidity == 0.02082886288568924
 
 
-def test_sample_without_params():
+def test_sample_without_params(smbus):
     smbus.write_byte_data = MagicMock()
-    smbus.read_word_data = MagicMock(side_effect=list(range(400)))
-    smbus.read_byte_data = MagicMock(side_effect=list(range(400)))
-    smbus.read_i2c_block_data = MagicMock(return_value=list(range(8)))
+    smbus.read_i2c_block_data = MagicMock(side_effect=lambda address, register, length:
+                                          list(range(8)) if register == 0xF7 else read_calibration_block(address, register, length))
 
     data = bme280.sample(bus=smbus, address=0x76)
 
@@ -92,7 +99,7 @@ def test_uncompensated_readings_repr():
     assert repr(reading) == "uncompensated_reading(temp=0x00003050, pressure=0x00001010, humidity=0x00000D15, block=01:01:02:03:05:08:0D:15)"
 
 
-def test_compensated_readings_repr():
+def test_compensated_readings_repr(compensation_params):
     block = [1, 1, 2, 3, 5, 8, 13, 21]
     raw = bme280.uncompensated_readings(block)
     reading = bme280.compensated_readings(raw, compensation_params)
@@ -101,10 +108,447 @@ def test_compensated_readings_repr():
     assert repr(reading) == "compensated_reading(id=55fea298-5a5d-4873-a46d-b631c8748100, timestamp=2018-03-18 19:26:14.206233UTC, temp=0.003 °C, pressure=8758647.58 hPa, humidity=0.05 % rH)"
 
 
-def test_compensated_readings_repr_zero_millis():
+def test_compensated_readings_repr_zero_millis(compensation_params):
     block = [1, 1, 2, 3, 5, 8, 13, 21]
     raw = bme280.uncompensated_readings(block)
     reading = bme280.compensated_readings(raw, compensation_params)
     reading.id = "55fea298-5a5d-4873-a46d-b631c8748100"
     reading.timestamp = datetime(2018, 3, 18, 19, 26, 14, tzinfo=pytz.UTC)
     assert repr(reading) == "compensated_reading(id=55fea298-5a5d-4873-a46d-b631c8748100, timestamp=2018-03-18 19:26:14.000000UTC, temp=0.003 °C, pressure=8758647.58 hPa, humidity=0.05 % rH)"
+
+
+def test_sample_compact(smbus, compensation_params):
+    smbus.write_byte_data = MagicMock()
+    smbus.read_i2c_block_data = MagicMock(return_value=list(range(8)))
+
+    data = bme280.sample(bus=smbus, address=0x76,
+                         compensation_params=compensation_params, compact=True)
+
+    assert isinstance(data, bme280.compact_reading)
+    assert data.pressure == 8801790.518824806
+    assert data.temperature == 0.0030482932925224304
+    assert data.humidity == 0.02082886288568924
+    assert not hasattr(data, "__dict__")
+
+
+def test_compact_reading_lazy_id_and_timestamp():
+    reading = bme280.compact_reading(20.5, 1013.25, 45.0, epoch=1521401174.206233)
+    assert reading._id is None
+    assert reading._timestamp is None
+
+    assert reading.id == reading.id
+    assert reading.timestamp == datetime(2018, 3, 18, 19, 26, 14, 206233, tzinfo=pytz.UTC)
+    assert repr(reading) == "compact_reading(timestamp=2018-03-18 19:26:14.206233UTC, temp=20.500 °C, pressure=1013.25 hPa, humidity=45.00 % rH)"
+
+
+def test_compensated_readings_is_compact_reading(compensation_params):
+    block = [1, 1, 2, 3, 5, 8, 13, 21]
+    raw = bme280.uncompensated_readings(block)
+    reading = bme280.compensated_readings(raw, compensation_params)
+    compact = bme280.compact_reading.from_raw(raw, compensation_params)
+
+    assert isinstance(reading, bme280.compact_reading)
+    assert reading.uncompensated is raw
+    assert (reading.temperature, reading.pressure, reading.humidity) == \
+        (compact.temperature, compact.pressure, compact.humidity)
+
+
+def test_compensate_int_datasheet_example():
+    # Worked example from the BMP280 datasheet (section 3.12), which shares
+    # the temperature and pressure formulas
+    comp = bme280.params(CALIBRATION,
+                         dig_T1=27504, dig_T2=26435, dig_T3=-1000,
+                         dig_P1=36477, dig_P2=-10685, dig_P3=3024, dig_P4=2855, dig_P5=140,
+                         dig_P6=-7, dig_P7=15500, dig_P8=-14600, dig_P9=6000)
+    raw = bme280.uncompensated_readings([0x65, 0x5A, 0xC0, 0x7E, 0xED, 0x00, 0x80, 0x00])
+    assert (raw.temperature, raw.pressure) == (519888, 415148)
+
+    temperature, pressure, _ = bme280.compensate_int(raw, comp)
+    assert temperature == 25.08
+    assert abs(pressure - 1006.5327) < 0.001
+
+
+def test_compensation_engines_agree():
+    rnd = random.Random(280)
+    for _ in range(1000):
+        block = [rnd.randrange(256) for _ in range(8)]
+        block[0] = rnd.randrange(0x40, 0x70)   # pressure MSB
+        block[3] = rnd.randrange(0x70, 0x88)   # temperature MSB
+        block[6] = rnd.randrange(0x50, 0x90)   # humidity MSB
+        raw = bme280.uncompensated_readings(block)
+        float_reading = bme280.compensated_readings(raw, CALIBRATION)
+        int_reading = bme280.compensated_readings(raw, CALIBRATION, engine=bme280.compensate_int)
+
+        assert abs(float_reading.temperature - int_reading.temperature) <= 0.01
+        assert abs(float_reading.pressure - int_reading.pressure) <= 0.01
+        assert abs(float_reading.humidity - int_reading.humidity) <= 0.01
+
+
+def test_sample_with_int_engine(smbus, compensation_params):
+    smbus.write_byte_data = MagicMock()
+    smbus.read_i2c_block_data = MagicMock(return_value=[0x65, 0x5A, 0xC0, 0x7E, 0xED, 0x00, 0x80, 0x00])
+
+    data = bme280.sample(bus=smbus, address=0x76, compensation_params=CALIBRATION,
+                         engine=bme280.compensate_int)
+    assert data.temperature == 21.96
+    assert data.pressure == 837.3687109375
+    assert data.humidity == 66.625
+
+
+def test_calibration_matches_params_exactly(compensation_params):
+    rnd = random.Random(8)
+    for comp in (compensation_params, CALIBRATION):
+        calibration = bme280.Calibration(comp)
+        for _ in range(1000):
+            raw = bme280.uncompensated_readings([rnd.randrange(256) for _ in range(8)])
+            assert bme280.compensate_float(raw, calibration) == bme280.compensate_float(raw, comp)
+            assert bme280.compensate_int(raw, calibration) == bme280.compensate_int(raw, comp)
+
+
+def test_calibration_compensate(compensation_params):
+    calibration = bme280.Calibration(compensation_params)
+    raw = bme280.uncompensated_readings(list(range(8)))
+    assert calibration.compensate(raw.temperature, raw.pressure, raw.humidity) == \
+        (0.0030482932925224304, 8801790.518824806, 0.02082886288568924)
+    assert calibration.dig_P7 == 16
+
+
+def test_calibration_divide_by_zero(compensation_params):
+    calibration = bme280.Calibration(bme280.params(compensation_params, dig_P1=0))
+    _, pressure, _ = calibration.compensate(0x80000, 0x80000, 0x8000)
+    assert pressure == 0
+
+
+def test_load_calibration(smbus):
+    smbus.read_i2c_block_data = MagicMock(side_effect=read_calibration_block)
+    calibration = bme280.load_calibration(bus=smbus, address=0x77)
+    assert isinstance(calibration, bme280.Calibration)
+    assert {name: getattr(calibration, name) for name in expected_calibration_params} == expected_calibration_params
+
+
+def test_calibration_cache_hits_and_misses():
+    loader = MagicMock(side_effect=lambda bus, address: (bus, address))
+    cache = bme280.CalibrationCache(loader)
+    bus = Mock()
+
+    assert cache(bus, 0x76) == (bus, 0x76)
+    assert cache(bus, 0x76) == (bus, 0x76)
+    assert cache(bus, 0x77) == (bus, 0x77)
+    assert loader.call_count == 2
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size, stats.maxsize) == (1, 2, 2, 32)
+    assert stats.load_time >= 0
+
+
+def test_calibration_cache_is_bounded():
+    loader = MagicMock(side_effect=lambda bus, address: address)
+    cache = bme280.CalibrationCache(loader, maxsize=2)
+    bus = Mock()
+
+    cache(bus, 1)
+    cache(bus, 2)
+    cache(bus, 1)
+    cache(bus, 3)
+    assert cache.stats().size == 2
+
+    # 2 was least recently used, so was evicted
+    cache(bus, 1)
+    cache(bus, 2)
+    assert [c.args[1] for c in loader.call_args_list] == [1, 2, 3, 2]
+
+
+def test_calibration_cache_invalidate():
+    loader = MagicMock(side_effect=lambda bus, address: address)
+    cache = bme280.CalibrationCache(loader)
+    bus1, bus2 = Mock(), Mock()
+    for bus in (bus1, bus2):
+        cache(bus, 0x76)
+        cache(bus, 0x77)
+
+    cache.invalidate(bus1, 0x76)
+    assert cache.stats().size == 3
+    cache.invalidate(bus2)
+    assert cache.stats().size == 1
+    cache.clear()
+    assert cache.stats().size == 0
+
+
+def test_status_poll_stops_when_conversion_complete(smbus):
+    smbus.read_byte_data = MagicMock(side_effect=[0x08, 0x08, 0x00])
+    poll = bme280.StatusPoll()
+    poll(smbus, 0x76, 1.0)
+    assert smbus.read_byte_data.call_args_list == [call(0x76, 0xF3)] * 3
+
+
+def test_status_poll_times_out(smbus):
+    smbus.read_byte_data = MagicMock(return_value=0x08)
+    poll = bme280.StatusPoll(interval=0.001, max_interval=0.002)
+    start = time.monotonic()
+    poll(smbus, 0x76, 0.01)
+    assert time.monotonic() - start < 0.1
+    assert smbus.read_byte_data.call_count > 1
+
+
+def test_status_poll_learns_conversion_time(smbus):
+    smbus.read_byte_data = MagicMock(side_effect=[0x08, 0x00, 0x00])
+    poll = bme280.StatusPoll()
+    poll(smbus, 0x76, 1.0)
+    estimate = poll._estimates[1.0]
+    assert estimate > 0
+
+    # Sleeps for most of the previous conversion time, then polls just once
+    poll(smbus, 0x76, 1.0)
+    assert smbus.read_byte_data.call_count == 3
+
+
+def test_sample_with_status_poll(smbus, compensation_params):
+    smbus.write_byte_data = MagicMock()
+    smbus.read_byte_data = MagicMock(side_effect=[0x08, 0x00])
+    smbus.read_i2c_block_data = MagicMock(return_value=list(range(8)))
+
+    data = bme280.sample(bus=smbus, address=0x76, compensation_params=compensation_params,
+                         wait=bme280.StatusPoll())
+    assert data.temperature == 0.0030482932925224304
+    assert smbus.read_byte_data.call_count == 2
+
+
+def read_data_registers(address, register, length):
+    data_registers = list(range(8))  # 0xF7-0xFE
+    return data_registers[register - 0xF7:][:length]
+
+
+def test_sample_per_channel_oversampling(smbus, compensation_params):
+    smbus.write_byte_data = MagicMock()
+    smbus.read_i2c_block_data = MagicMock(side_effect=read_data_registers)
+
+    data = bme280.sample(bus=smbus, address=0x76, compensation_params=compensation_params,
+                         p_sampling=bme280.oversampling.x16, h_sampling=bme280.oversampling.skip)
+
+    assert smbus.write_byte_data.call_args_list == [
+        call(0x76, 0xF2, 0),
+        call(0x76, 0xF4, 1 << 5 | 5 << 2 | 1)
+    ]
+    assert data.temperature == 0.0030482932925224304
+    assert data.pressure == 8801790.518824806
+    assert data.humidity is None
+    assert data.uncompensated.humidity is None
+    assert "humidity=None % rH" in repr(data)
+    smbus.read_i2c_block_data.assert_called_once_with(0x76, 0xF7, 6)
+
+
+def test_sample_skip_pressure_compact(smbus, compensation_params):
+    smbus.write_byte_data = MagicMock()
+    smbus.read_i2c_block_data = MagicMock(side_effect=read_data_registers)
+
+    for engine in (bme280.compensate_float, bme280.compensate_int):
+        data = bme280.sample(bus=smbus, address=0x76, compensation_params=bme280.Calibration(compensation_params),
+                             p_sampling=bme280.oversampling.skip, compact=True, engine=engine)
+        assert data.pressure is None
+        assert data.humidity is not None
+        smbus.read_i2c_block_data.assert_called_with(0x76, 0xFA, 5)
+
+
+def test_sample_cannot_skip_temperature(smbus, compensation_params):
+    with pytest.raises(ValueError):
+        bme280.sample(bus=smbus, address=0x76, compensation_params=compensation_params,
+                      t_sampling=bme280.oversampling.skip)
+
+
+def test_sample_cannot_skip_default_sampling(smbus, compensation_params):
+    with pytest.raises(ValueError):
+        bme280.sample(bus=smbus, address=0x76, compensation_params=compensation_params,
+                      sampling=bme280.oversampling.skip)
+    smbus.write_byte_data.assert_not_called()
+
+
+def test_sample_none_sampling_is_x1(smbus, compensation_params):
+    smbus.write_byte_data = MagicMock()
+    smbus.read_i2c_block_data = MagicMock(return_value=list(range(8)))
+    bme280.sample(bus=smbus, address=0x76, compensation_params=compensation_params, sampling=None)
+    assert call(0x76, 0xF2, bme280.oversampling.x1) in smbus.write_byte_data.call_args_list
+
+
+@pytest.mark.parametrize("channel", ["sampling", "t_sampling", "h_sampling", "p_sampling"])
+def test_sample_invalid_oversampling(channel, smbus, compensation_params):
+    with pytest.raises(ValueError):
+        bme280.sample(bus=smbus, address=0x76, compensation_params=compensation_params,
+                      **{channel: 9})
+    smbus.write_byte_data.assert_not_called()
+
+
+def test_calc_delay_only_counts_enabled_channels():
+    all_channels = bme280._calc_delay(1, 1, 1)
+    assert bme280._calc_delay(1, 0, 1) < all_channels
+    assert bme280._calc_delay(1, 0, 0) == pytest.approx(0.00125 + 0.0023 * 2)
+
+
+def test_sample_temperature_only(smbus, compensation_params):
+    smbus.write_byte_data = MagicMock()
+    smbus.read_i2c_block_data = MagicMock(side_effect=read_data_registers)
+
+    data = bme280.sample(bus=smbus, address=0x76, compensation_params=compensation_params,
+                         p_sampling=bme280.oversampling.skip, h_sampling=bme280.oversampling.skip)
+
+    smbus.read_i2c_block_data.assert_called_once_with(0x76, 0xFA, 3)
+    assert data.temperature == 0.0030482932925224304
+    assert data.pressure is None
+    assert data.humidity is None
+
+
+def test_uncompensated_readings_partial_blocks():
+    block = [1, 1, 2, 3, 5, 8, 13, 21]
+    full = bme280.uncompensated_readings(block)
+
+    raw = bme280.uncompensated_readings(block[:6])
+    assert (raw.temperature, raw.pressure, raw.humidity) == (full.temperature, full.pressure, None)
+
+    raw = bme280.uncompensated_readings(block[3:], 0xFA)
+    assert (raw.temperature, raw.pressure, raw.humidity) == (full.temperature, None, full.humidity)
+
+    raw = bme280.uncompensated_readings(block[3:6], 0xFA)
+    assert (raw.temperature, raw.pressure, raw.humidity) == (full.temperature, None, None)
+    assert repr(raw) == "uncompensated_reading(temp=0x00003050, pressure=None, humidity=None, block=03:05:08)"
+
+
+def test_filter_and_standby_constants_are_const():
+    assert bme280.filter_coefficient.x16 == 4
+    assert bme280.STANDBY_TIMES[bme280.standby_time.ms_10] == 0.010
+    with pytest.raises(bme280.const.ConstError):
+        bme280.standby_time.ms_10 = 3
+
+
+def test_calibration_fingerprint_matches_nvm(smbus):
+    smbus.read_byte_data = MagicMock(return_value=0x60)
+    smbus.read_i2c_block_data = MagicMock(side_effect=read_calibration_block)
+    assert bme280.calibration_fingerprint(bme280.params(expected_calibration_params)) == \
+        bme280.nvm_fingerprint(smbus, 0x76)
+
+
+def test_calibration_fingerprint_covers_whole_nvm():
+    fingerprint = bme280.calibration_fingerprint(CALIBRATION)
+    for name in ("dig_T1", "dig_P1", "dig_P9", "dig_H1", "dig_H6"):
+        changed = bme280.params(CALIBRATION, **{name: CALIBRATION[name] + 1})
+        assert bme280.calibration_fingerprint(changed) != fingerprint
+
+
+def test_nvm_fingerprint_without_block_reads():
+    bus = SimulatedBus(realtime=False, block_reads=False)
+    assert bme280.nvm_fingerprint(bus, 0x76) == bme280.calibration_fingerprint(CALIBRATION)
+
+
+def test_reset_waits_until_ready(smbus):
+    smbus.write_byte_data = MagicMock()
+    smbus.read_byte_data = MagicMock(side_effect=[OSError(121, "Remote I/O error"), 0x01, 0x00])
+    bme280.reset(smbus, 0x76)
+    smbus.write_byte_data.assert_called_once_with(0x76, 0xE0, 0xB6)
+    assert smbus.read_byte_data.call_args_list == [call(0x76, 0xF3)] * 3
+
+
+def test_reset_times_out(smbus):
+    smbus.write_byte_data = MagicMock()
+    smbus.read_byte_data = MagicMock(return_value=0x01)
+    with pytest.raises(TimeoutError):
+        bme280.reset(smbus, 0x76, timeout=0.002)
+
+
+def flaky(fn, failures):
+    # Fails the first few calls
+    calls = iter(range(failures))
+
+    def call(*args):
+        if next(calls, None) is not None:
+            raise OSError(121, "Remote I/O error")
+        return fn(*args)
+    return call
+
+
+def test_sample_retry_recovers_without_reloading_calibration():
+    bus = SimulatedBus(realtime=False)
+    calibration = bme280.Calibration(CALIBRATION)
+    bus.read_i2c_block_data = MagicMock(side_effect=flaky(bus.read_i2c_block_data, 1))
+    bus.write_byte_data = MagicMock(side_effect=bus.write_byte_data)
+
+    data = bme280.sample(bus, 0x76, calibration, compact=True, retry=bme280.Retry())
+
+    assert data.temperature == pytest.approx(20.0, abs=0.01)
+    assert call(0x76, 0xE0, 0xB6) in bus.write_byte_data.call_args_list
+    # Just the NVM for the fingerprint and the data registers
+    assert bus.read_i2c_block_data.call_args_list == [
+        call(0x76, 0xF7, 8),
+        call(0x76, 0x88, 26),
+        call(0x76, 0xE1, 7),
+        call(0x76, 0xF7, 8)
+    ]
+
+
+def test_sample_retry_reloads_changed_calibration():
+    bus = SimulatedBus(realtime=False)
+    stale = bme280.params(CALIBRATION, dig_H2=CALIBRATION.dig_H2 + 1)
+    bus.read_i2c_block_data = flaky(bus.read_i2c_block_data, 1)
+
+    data = bme280.sample(bus, 0x76, stale, retry=bme280.Retry(reset=False))
+    assert data.humidity == pytest.approx(45.0, abs=0.01)
+
+
+def test_sample_retry_reloads_changed_temperature_and_pressure_calibration():
+    bus = SimulatedBus(realtime=False)
+    stale = bme280.params(CALIBRATION, dig_T2=CALIBRATION.dig_T2 + 100,
+                          dig_P1=CALIBRATION.dig_P1 + 100)
+    bus.read_i2c_block_data = flaky(bus.read_i2c_block_data, 1)
+
+    data = bme280.sample(bus, 0x76, stale, retry=bme280.Retry(reset=False))
+    assert data.temperature == pytest.approx(20.0, abs=0.01)
+    assert data.pressure == pytest.approx(1013.25, abs=0.05)
+
+
+def test_sample_retry_invalidates_cached_calibration():
+    bus = SimulatedBus(realtime=False)
+    bme280.calibration_cache.clear()
+    bme280.sample(bus, 0x76)
+    misses = bme280.calibration_cache.stats().misses
+
+    bus.devices[0x76]._nvm = (bus.devices[0x76]._nvm[0], b"\x00" * 7)
+    bus.devices[0x76].reset()
+    bus.read_i2c_block_data = flaky(bus.read_i2c_block_data, 1)
+    bme280.sample(bus, 0x76, retry=bme280.Retry())
+
+    assert bme280.calibration_cache(bus, 0x76).dig_H2 == 0
+    assert bme280.calibration_cache.stats().misses == misses + 1
+    bme280.calibration_cache.clear()
+
+
+def test_sample_retry_gives_up():
+    bus = SimulatedBus(realtime=False)
+    bus.read_i2c_block_data = flaky(bus.read_i2c_block_data, 100)
+
+    with pytest.raises(OSError):
+        bme280.sample(bus, 0x76, bme280.params(expected_calibration_params),
+                      retry=bme280.Retry(attempts=2, backoff=0.0001))
+
+
+def test_uncompensated_readings_from_buffer():
+    block = [0x54, 0x2B, 0x00, 0x80, 0x46, 0x00, 0x6E, 0x8C]
+    expected = bme280.uncompensated_readings(block)
+
+    for buffer in (bytes(block), bytearray([0xFF] * 3 + block), memoryview(bytes([0] * 3 + block))):
+        raw = bme280.uncompensated_readings.from_buffer(buffer, len(buffer) - 8)
+        assert (raw.temperature, raw.pressure, raw.humidity) == \
+            (expected.temperature, expected.pressure, expected.humidity)
+        assert repr(raw) == repr(expected)
+
+
+def test_decode_blocks():
+    blocks = [[random.randint(0, 255) for _ in range(8)] for _ in range(20)]
+    buffer = bytearray([0xAA, 0xBB]) + bytearray(b for block in blocks for b in block)
+
+    decoded = bme280.decode_blocks(buffer, 2)
+    assert len(decoded) == 20
+    for block, values in zip(blocks, decoded):
+        raw = bme280.uncompensated_readings(block)
+        assert values == (raw.temperature, raw.pressure, raw.humidity)
+
+    assert bme280.decode_blocks(memoryview(buffer), 10, count=2) == decoded[1:3]
+    assert bme280.decode_blocks(b"") == []
+    with pytest.raises(ValueError):
+        bme280.decode_blocks(buffer, 2, count=21)
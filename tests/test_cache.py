@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+from unittest.mock import Mock, MagicMock
+from bme280.cache import CalibrationStore
+import bme280
+
+nvm = {
+    0xD0: [0x60],
+    0x88: [0, 0, 1, 0, 2, 0, 3, 0, 4, 0, 5, 0, 6, 0, 7, 0, 8, 0, 9, 0, 10, 0, 11, 0, 0xFF, 0],
+    0xE1: [12, 0, 1, 2, 3, 4, 5]
+}
+
+
+def nvm_bus(registers):
+    bus = Mock(unsafe=True)
+    bus.read_byte_data = MagicMock(side_effect=lambda address, register: registers[register][0])
+    bus.read_i2c_block_data = MagicMock(side_effect=lambda address, register, length: registers[register][:length])
+    return bus
+
+
+def transactions(bus):
+    return bus.read_byte_data.call_count + bus.read_i2c_block_data.call_count
+
+
+def test_load_miss_then_hit(tmpdir):
+    store = CalibrationStore(str(tmpdir))
+
+    bus = nvm_bus(nvm)
+    calibration = store.load(bus, 1, 0x77)
+    assert isinstance(calibration, bme280.Calibration)
+    assert calibration.dig_H4 == 35
+    assert tmpdir.join("bus1-0x77.json").check()
+
+    bus = nvm_bus(nvm)
+    calibration = store.load(bus, 1, 0x77)
+    assert calibration.dig_H4 == 35
+    assert transactions(bus) == 3
+
+
+def test_load_fingerprint_mismatch(tmpdir):
+    store = CalibrationStore(str(tmpdir))
+    store.load(nvm_bus(nvm), 1, 0x76)
+
+    swapped = dict(nvm)
+    swapped[0xE1] = [13, 0, 1, 2, 3, 4, 5]
+    bus = nvm_bus(swapped)
+    calibration = store.load(bus, 1, 0x76)
+    assert calibration.dig_H2 == 13
+    # The params read for the fingerprint are stored, not read again
+    assert transactions(bus) == 3
+
+    bus = nvm_bus(swapped)
+    assert store.load(bus, 1, 0x76).dig_H2 == 13
+    assert transactions(bus) == 3
+
+
+def test_load_temperature_and_pressure_mismatch(tmpdir):
+    store = CalibrationStore(str(tmpdir))
+    store.load(nvm_bus(nvm), 1, 0x76)
+
+    swapped = dict(nvm)
+    swapped[0x88] = [7, 0] + nvm[0x88][2:6] + [9, 0] + nvm[0x88][8:]
+    calibration = store.load(nvm_bus(swapped), 1, 0x76)
+    assert calibration.dig_T1 == 7
+    assert calibration.dig_P1 == 9
+
+
+def test_load_without_verifying(tmpdir):
+    CalibrationStore(str(tmpdir)).load(nvm_bus(nvm), 1, 0x76)
+
+    store = CalibrationStore(str(tmpdir), verify=False)
+    bus = nvm_bus(nvm)
+    assert store.load(bus, 1, 0x76).dig_H4 == 35
+    assert transactions(bus) == 0
+
+    bus = nvm_bus(nvm)
+    store.load(bus, 2, 0x76)
+    assert transactions(bus) == 3
+
+
+def test_load_corrupt_file(tmpdir):
+    tmpdir.join("bus0-0x76.json").write("{not json")
+    store = CalibrationStore(str(tmpdir))
+    assert store.load(nvm_bus(nvm), 0).dig_T3 == 2
+
+
+def test_invalidate(tmpdir):
+    store = CalibrationStore(str(tmpdir))
+    store.load(nvm_bus(nvm), 3, 0x76)
+    store.invalidate(3, 0x76)
+    assert not tmpdir.join("bus3-0x76.json").check()
+    store.invalidate(3, 0x76)
+
+
+def test_default_directory(monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", "/var/cache")
+    assert CalibrationStore().directory == "/var/cache/bme280"
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+import threading
+import time
+import pytest
+
+pytest.importorskip("multiprocessing.shared_memory")
+from bme280.collector import Collector, _Ring  # noqa: E402
+from bme280.simulator import Environment, SimulatedBME280, SimulatedBus  # noqa: E402
+import bme280  # noqa: E402
+
+
+def open_simulated_bus(bus_number):
+    # Bus n has a sensor at 0x76, at n degrees
+    return SimulatedBus({0x76: SimulatedBME280(environment=Environment(temperature=float(bus_number)))},
+                        realtime=False)
+
+
+def wait_for(fn, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = fn()
+        if result:
+            return result
+        time.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+def test_ring():
+    buf = bytearray(2 * (8 + 3 * 48))
+    lock = threading.Lock()
+    ring = _Ring(memoryview(buf), 1, 3, lock)
+    assert ring.latest() is None
+    for i in range(5):
+        ring.write(1, 0x76, bme280.compact_reading(float(i), None, 50.0, epoch=1000.0 + i))
+
+    assert ring.count() == 5
+    assert ring.read(1) is None
+    reading = ring.read(4)
+    assert (reading.temperature, reading.pressure, reading.humidity, reading.epoch) == (4.0, None, 50.0, 1004.0)
+    assert ring.latest().epoch == 1004.0
+    assert ring.read(5) is None
+    assert _Ring(memoryview(buf), 0, 3, lock).count() == 0
+
+
+def test_collects_from_each_bus():
+    sensors = [(1, 0x76), (2, 0x76), (2, 0x77)]
+    with Collector(sensors, interval=0.02, depth=4, open_bus=open_simulated_bus) as collector:
+        assert len(collector._processes) == 2
+        wait_for(lambda: all(collector.latest()[sensor] for sensor in sensors[:2]))
+        wait_for(lambda: len(collector.history(1, 0x76)) == 4)
+
+        latest = collector.latest()
+        history = collector.history(2, 0x76)
+
+    assert list(latest) == sensors
+    assert latest[(1, 0x76)].temperature == pytest.approx(1.0, abs=0.01)
+    assert latest[(2, 0x76)].temperature == pytest.approx(2.0, abs=0.01)
+    assert latest[(2, 0x77)] is None
+    assert [r.epoch for r in history] == sorted(r.epoch for r in history)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+import math
+import warnings
+from bme280.derived import absolute_humidity, absolute_humidity_batch, altitude, \
+    altitude_batch, dew_point, dew_point_batch, sea_level_pressure, \
+    sea_level_pressure_batch
+from bme280.history import History
+import bme280
+import pytest
+
+
+def test_dew_point():
+    assert dew_point(20.0, 100.0) == pytest.approx(20.0)
+    assert dew_point(20.0, 50.0) == pytest.approx(9.26, abs=0.01)
+    assert dew_point(20.0, 0.0) == -math.inf
+    assert dew_point(20.0, None) is None
+
+
+def test_absolute_humidity():
+    assert absolute_humidity(20.0, 50.0) == pytest.approx(8.62, abs=0.01)
+    assert absolute_humidity(30.0, 100.0) == pytest.approx(30.3, abs=0.1)
+    assert absolute_humidity(None, 50.0) is None
+
+
+def test_altitude_and_sea_level_pressure():
+    assert altitude(1013.25) == 0.0
+    assert altitude(898.76) == pytest.approx(1000.0, abs=1.0)
+    assert altitude(900.0, sea_level_pressure=1020.0) == pytest.approx(altitude(900.0 * 1013.25 / 1020.0), abs=1.0)
+    assert altitude(None) is None
+
+    assert sea_level_pressure(898.76, 1000.0) == pytest.approx(1013.25, abs=0.1)
+    assert sea_level_pressure(950.0, altitude(950.0, 1005.0)) == pytest.approx(1005.0)
+    assert sea_level_pressure(None, 100.0) is None
+
+
+def test_batch_matches_scalar():
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(1)
+    temperature = rng.uniform(-20.0, 40.0, 100)
+    humidity = rng.uniform(1.0, 100.0, 100)
+    humidity[:5] = 0.0
+    pressure = rng.uniform(800.0, 1100.0, 100)
+    height = rng.uniform(-100.0, 2000.0, 100)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        dew_points = dew_point_batch(temperature, humidity)
+    assert np.allclose(dew_points,
+                       [dew_point(t, h) for t, h in zip(temperature, humidity)])
+    assert np.allclose(absolute_humidity_batch(temperature, humidity),
+                       [absolute_humidity(t, h) for t, h in zip(temperature, humidity)])
+    assert np.allclose(altitude_batch(pressure, 1020.0),
+                       [altitude(p, 1020.0) for p in pressure])
+    assert np.allclose(sea_level_pressure_batch(pressure, height),
+                       [sea_level_pressure(p, a) for p, a in zip(pressure, height)])
+
+
+def test_batch_from_history():
+    pytest.importorskip("numpy")
+    history = History(4)
+    for i in range(4):
+        history.append(bme280.compact_reading(20.0 + i, 1000.0, 50.0, epoch=i))
+
+    dew_points = dew_point_batch(history.values("temperature"), history.values("humidity"))
+    assert dew_points.shape == (4,)
+    assert dew_points[0] == pytest.approx(dew_point(20.0, 50.0))
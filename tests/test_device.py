@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+from unittest.mock import MagicMock, call
+from bme280.device import BME280
+from bme280.simulator import CALIBRATION, SimulatedBus
+import bme280
+import pytest
+
+
+def test_forced_mode_writes_only_trigger_after_first_sample(compensation_params, smbus):
+    device = BME280(smbus, 0x77, compensation_params)
+    data = device.sample()
+    assert data.temperature == 0.0030482932925224304
+    assert smbus.write_byte_data.call_args_list == [
+        call(0x77, 0xF5, 0x00),
+        call(0x77, 0xF2, 1),
+        call(0x77, 0xF4, 1 << 5 | 1 << 2 | 1)
+    ]
+
+    smbus.write_byte_data.reset_mock()
+    device.sample()
+    device.sample()
+    assert smbus.write_byte_data.call_args_list == [call(0x77, 0xF4, 1 << 5 | 1 << 2 | 1)] * 2
+    assert smbus.read_i2c_block_data.call_count == 3
+
+
+def test_changing_configuration(compensation_params, smbus):
+    device = BME280(smbus, 0x76, compensation_params)
+    device.sample()
+    smbus.write_byte_data.reset_mock()
+
+    device.sampling = bme280.oversampling.x4
+    device.iir_filter = 2
+    device.sample()
+    assert smbus.write_byte_data.call_args_list == [
+        call(0x76, 0xF5, 2 << 2),
+        call(0x76, 0xF2, 3),
+        call(0x76, 0xF4, 3 << 5 | 3 << 2 | 1)
+    ]
+
+
+def test_normal_mode_only_reads(compensation_params, smbus):
+    device = BME280(smbus, 0x76, compensation_params, mode=bme280.NORMAL_MODE, standby=1)
+    device.sample()
+    # The sensor may already be in normal mode, so the config goes via sleep
+    assert smbus.write_byte_data.call_args_list == [
+        call(0x76, 0xF4, 0x00),
+        call(0x76, 0xF5, 1 << 5),
+        call(0x76, 0xF2, 1),
+        call(0x76, 0xF4, 1 << 5 | 1 << 2 | 3)
+    ]
+
+    smbus.write_byte_data.reset_mock()
+    device.sample()
+    device.sample()
+    smbus.write_byte_data.assert_not_called()
+    assert smbus.read_i2c_block_data.call_count == 3
+
+
+def test_normal_mode_config_change_goes_via_sleep(compensation_params, smbus):
+    device = BME280(smbus, 0x76, compensation_params, mode=bme280.NORMAL_MODE)
+    device.sample()
+    smbus.write_byte_data.reset_mock()
+
+    device.standby = 5
+    device.sample()
+    assert smbus.write_byte_data.call_args_list == [
+        call(0x76, 0xF4, 0x00),
+        call(0x76, 0xF5, 5 << 5),
+        call(0x76, 0xF4, 1 << 5 | 1 << 2 | 3)
+    ]
+
+
+def test_sleep(compensation_params, smbus):
+    device = BME280(smbus, 0x76, compensation_params, mode=bme280.NORMAL_MODE)
+    device.sleep()
+    smbus.write_byte_data.assert_not_called()
+
+    device.sample()
+    smbus.write_byte_data.reset_mock()
+    device.sleep()
+    device.sleep()
+    smbus.write_byte_data.assert_called_once_with(0x76, 0xF4, 1 << 5 | 1 << 2)
+
+    smbus.write_byte_data.reset_mock()
+    device.sample()
+    smbus.write_byte_data.assert_called_once_with(0x76, 0xF4, 1 << 5 | 1 << 2 | 3)
+
+
+def test_compact_int_engine(compensation_params, smbus):
+    device = BME280(smbus, 0x76, compensation_params, compact=True, engine=bme280.compensate_int)
+    assert isinstance(device.sample(), bme280.compact_reading)
+
+
+def test_status_poll(compensation_params, smbus):
+    smbus.read_byte_data = MagicMock(side_effect=[0x08, 0x00])
+    device = BME280(smbus, 0x76, compensation_params, wait=bme280.StatusPoll())
+    device.sample()
+    assert smbus.read_byte_data.call_args_list == [call(0x76, 0xF3)] * 2
+
+
+def test_skip_channels(compensation_params, smbus):
+    smbus.read_i2c_block_data = MagicMock(side_effect=lambda address, register, length: list(range(8))[:length])
+    device = BME280(smbus, 0x76, compensation_params, h_sampling=bme280.oversampling.skip)
+    data = device.sample()
+    smbus.read_i2c_block_data.assert_called_once_with(0x76, 0xF7, 6)
+    assert smbus.write_byte_data.call_args_list == [
+        call(0x76, 0xF5, 0x00),
+        call(0x76, 0xF2, 0),
+        call(0x76, 0xF4, 1 << 5 | 1 << 2 | 1)
+    ]
+    assert data.humidity is None
+    assert data.pressure == 8801790.518824806
+
+
+def test_filter_and_standby_constants(compensation_params, smbus):
+    device = BME280(smbus, 0x76, compensation_params, mode=bme280.NORMAL_MODE,
+                    standby=bme280.standby_time.ms_1000, iir_filter=bme280.filter_coefficient.x16)
+    device.sample()
+    assert smbus.write_byte_data.call_args_list[1] == call(0x76, 0xF5, 5 << 5 | 4 << 2)
+
+
+def test_invalid_filter_or_standby(compensation_params, smbus):
+    device = BME280(smbus, 0x76, compensation_params, iir_filter=5)
+    with pytest.raises(ValueError):
+        device.sample()
+
+    device.iir_filter = bme280.filter_coefficient.x2
+    device.standby = 8
+    with pytest.raises(ValueError):
+        device.sample()
+    smbus.write_byte_data.assert_not_called()
+
+
+def test_invalid_oversampling(compensation_params, smbus):
+    device = BME280(smbus, 0x76, compensation_params, h_sampling=9)
+    with pytest.raises(ValueError):
+        device.sample()
+    smbus.write_byte_data.assert_not_called()
+
+
+def test_reset_then_sample():
+    bus = SimulatedBus(realtime=False)
+    device = BME280(bus, 0x76, CALIBRATION, mode=bme280.NORMAL_MODE)
+    assert device.sample().temperature == pytest.approx(20.0, abs=0.01)
+    calibration = device.calibration
+
+    device.reset()
+    assert bus.read_byte_data(0x76, 0xF4) == 0
+    data = device.sample()
+
+    assert bus.read_byte_data(0x76, 0xF4) & 0x03 == bme280.NORMAL_MODE
+    assert data.temperature == pytest.approx(20.0, abs=0.01)
+    assert data.pressure == pytest.approx(1013.25, abs=0.05)
+    assert device.calibration is calibration
+
+
+def test_reset_reloads_changed_calibration():
+    bus = SimulatedBus(realtime=False)
+    device = BME280(bus, 0x76, bme280.params(CALIBRATION, dig_H2=0))
+
+    device.reset()
+    assert device.calibration.dig_H2 == CALIBRATION.dig_H2
+
+
+def test_reset_reloads_changed_temperature_and_pressure_calibration():
+    bus = SimulatedBus(realtime=False)
+    device = BME280(bus, 0x76, bme280.params(CALIBRATION, dig_T1=0, dig_P1=0))
+
+    device.reset()
+    assert device.calibration.dig_T1 == CALIBRATION.dig_T1
+    assert device.calibration.dig_P1 == CALIBRATION.dig_P1
+
+
+def test_retry_rewrites_registers_after_recovery():
+    bus = SimulatedBus(realtime=False)
+    device = BME280(bus, 0x76, CALIBRATION, mode=bme280.NORMAL_MODE, retry=bme280.Retry())
+    device.sample()
+
+    read = bus.read_i2c_block_data
+
+    def flaky(*args):
+        bus.read_i2c_block_data = read
+        raise OSError(121, "Remote I/O error")
+    bus.read_i2c_block_data = flaky
+
+    # The retry soft resets the sensor, so normal mode must be set up again
+    data = device.sample()
+    assert bus.read_byte_data(0x76, 0xF4) & 0x03 == bme280.NORMAL_MODE
+    assert data.temperature == pytest.approx(20.0, abs=0.01)
+    assert data.pressure == pytest.approx(1013.25, abs=0.05)
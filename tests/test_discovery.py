@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+from unittest.mock import MagicMock
+from bme280.device import BME280
+from bme280.discovery import bus_numbers, discover, probe
+from bme280.simulator import CALIBRATION, SimulatedBME280, SimulatedBus
+import bme280
+import pytest
+
+
+def setup_function(function):
+    bme280.calibration_cache.clear()
+
+
+def test_bus_numbers(tmp_path):
+    for name in ("i2c-10", "i2c-1", "i2c-2", "spidev0.0"):
+        (tmp_path / name).touch()
+    assert bus_numbers(str(tmp_path / "i2c-*")) == [1, 2, 10]
+
+
+def test_probe():
+    bus = SimulatedBus(realtime=False)
+    assert probe(bus, 0x76)
+    assert not probe(bus, 0x77)
+
+    bus.read_byte_data = MagicMock(return_value=0x58)  # BMP280
+    assert not probe(bus, 0x76)
+
+
+def test_discover():
+    bus_1 = SimulatedBus({0x76: SimulatedBME280(), 0x77: SimulatedBME280()}, realtime=False)
+    bus_2 = SimulatedBus({0x77: SimulatedBME280()}, realtime=False)
+    empty = SimulatedBus({}, realtime=False)
+
+    devices = discover([bus_1, empty, bus_2], compact=True)
+
+    assert [(d.bus, d.address) for d in devices] == [(bus_1, 0x76), (bus_1, 0x77), (bus_2, 0x77)]
+    assert all(isinstance(d, BME280) and d.compact for d in devices)
+    assert devices[2].calibration.dig_T1 == CALIBRATION.dig_T1
+    assert devices[0].sample().temperature == pytest.approx(20.0, abs=0.01)
+
+
+def test_discover_by_bus_number():
+    buses = {1: SimulatedBus(realtime=False), 2: SimulatedBus({}, realtime=False)}
+    for bus in buses.values():
+        bus.close = MagicMock()
+
+    def open_bus(number):
+        if number not in buses:
+            raise FileNotFoundError(number)
+        return buses[number]
+
+    devices = discover([1, 2, 3], open_bus=open_bus)
+
+    assert [(d.bus, d.address) for d in devices] == [(buses[1], 0x76)]
+    buses[1].close.assert_not_called()
+    buses[2].close.assert_called_once_with()
+
+
+def test_discover_nothing():
+    assert discover([]) == []
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+import random
+import statistics
+from bme280.history import History
+import bme280
+import pytest
+
+
+def test_rolling_statistics_match_window():
+    rnd = random.Random(16)
+    history = History(50)
+    window = []
+    for epoch in range(500):
+        reading = bme280.compact_reading(rnd.gauss(20, 5), rnd.gauss(1000, 10), rnd.uniform(0, 100), epoch=epoch)
+        history.append(reading)
+        window = (window + [reading])[-50:]
+
+        for channel in ("temperature", "pressure", "humidity"):
+            values = [getattr(r, channel) for r in window]
+            assert len(history) == len(values)
+            assert history.mean(channel) == pytest.approx(statistics.mean(values))
+            assert history.variance(channel) == pytest.approx(statistics.pvariance(values), rel=1e-6, abs=1e-9)
+            assert history.min(channel) == min(values)
+            assert history.max(channel) == max(values)
+            assert history.latest(channel) == values[-1]
+            assert list(history.values(channel)) == values
+
+    assert list(history.epochs()) == [float(r.epoch) for r in window]
+
+
+def test_trend():
+    history = History(10, channels=("pressure",))
+    history.add(0.0, 1000.0)
+    assert history.trend("pressure") == 0.0
+
+    for i in range(1, 20):
+        history.add(i * 60.0, 1000.0 - i * 0.1)
+    assert history.trend("pressure") == pytest.approx(-0.1 / 60)
+    assert history.stdev("pressure") > 0
+
+
+def test_empty_history():
+    history = History(5)
+    assert len(history) == 0
+    assert list(history.values("humidity")) == []
+    with pytest.raises(ValueError):
+        history.mean("temperature")
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        History(0)
+    with pytest.raises(ValueError):
+        History(10, channels=("altitude",))
+
+
+def test_skipped_channel():
+    reading = bme280.compact_reading(21.0, 1000.0, None, epoch=1.0)
+
+    history = History(5)
+    with pytest.raises(ValueError, match="humidity"):
+        history.append(reading)
+    assert len(history) == 0
+
+    history = History(5, channels=("temperature", "pressure"))
+    history.append(reading)
+    assert history.mean("temperature") == 21.0
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+from bme280.instrument import BUCKETS, Histogram, Metrics
+from bme280.simulator import CALIBRATION, SimulatedBus
+import bme280
+import pytest
+
+
+def test_histogram():
+    histogram = Histogram()
+    histogram.observe(0.000015)
+    histogram.observe(0.003)
+    histogram.observe(5.0)
+
+    assert histogram.count == 3
+    assert histogram.sum == pytest.approx(5.003015)
+    cumulative = dict(histogram.cumulative())
+    assert cumulative[0.00001] == 0
+    assert cumulative[0.00002] == 1
+    assert cumulative[0.005] == 2
+    assert cumulative[BUCKETS[-1]] == 3
+
+
+def test_instrumented_sample():
+    metrics = Metrics()
+    bus = metrics.bus(SimulatedBus(realtime=False), name="i2c-1")
+
+    data = bme280.sample(bus, 0x76, CALIBRATION,
+                         wait=metrics.wait(bme280.wait_sleep),
+                         engine=metrics.engine(bme280.compensate_float))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["transactions"] == {("i2c-1", 0x76): 3}
+    assert snapshot["bytes"] == {("i2c-1", 0x76): 10}
+    assert snapshot["histograms"]["write"]["count"] == 2
+    assert snapshot["histograms"]["read"]["count"] == 1
+    assert snapshot["histograms"]["conversion_wait"]["sum"] >= bme280._calc_delay(1, 1, 1)
+    assert snapshot["histograms"]["compute"]["count"] == 1
+    assert data.temperature == pytest.approx(20.0, abs=0.01)
+
+
+def test_failed_transactions_are_counted():
+    metrics = Metrics()
+    bus = metrics.bus(SimulatedBus(realtime=False))
+
+    with pytest.raises(OSError):
+        bme280.load_calibration_params(bus, 0x77)
+
+    assert metrics.snapshot()["transactions"][(bus._bus, 0x77)] == 1
+
+
+def test_reset():
+    metrics = Metrics()
+    bus = metrics.bus(SimulatedBus(realtime=False))
+    bme280.load_calibration_params(bus, 0x76)
+    assert metrics.transactions
+
+    metrics.reset()
+    assert metrics.snapshot()["transactions"] == {}
+    assert metrics.histograms["read"].count == 0
+
+
+def test_passes_through_attributes():
+    bus = Metrics().bus(SimulatedBus(realtime=False))
+    assert bus.clock_hz == 100000
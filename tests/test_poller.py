@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+from unittest.mock import Mock, call
+import errno
+from bme280.poller import MultiSensorPoller
+import bme280
+
+
+def test_poll_triggers_all_before_reading(create_bus, compensation_params):
+    bus = create_bus()
+    events = Mock()
+    events.attach_mock(bus.write_byte_data, "write")
+    events.attach_mock(bus.read_i2c_block_data, "read")
+
+    poller = MultiSensorPoller()
+    poller.register(bus, 0x76, compensation_params)
+    poller.register(bus, 0x77, compensation_params, sampling=bme280.oversampling.x4)
+    readings = poller.poll()
+
+    assert list(readings) == [(bus, 0x76), (bus, 0x77)]
+    assert readings[(bus, 0x77)].temperature == 0.0030482932925224304
+    assert events.mock_calls == [
+        call.write(0x76, 0xF2, 1),
+        call.write(0x76, 0xF4, 1 << 5 | 1 << 2 | 1),
+        call.write(0x77, 0xF2, 3),
+        call.write(0x77, 0xF4, 3 << 5 | 3 << 2 | 1),
+        call.read(0x76, 0xF7, 8),
+        call.read(0x77, 0xF7, 8)
+    ]
+
+
+def test_poll_many_buses(create_bus, compensation_params):
+    buses = [create_bus() for _ in range(3)]
+    with MultiSensorPoller() as poller:
+        for bus in buses:
+            poller.register(bus, 0x76, compensation_params)
+            poller.register(bus, 0x77, compensation_params)
+        readings = poller.poll()
+
+    assert len(readings) == 6
+    for bus in buses:
+        assert bus.read_i2c_block_data.call_count == 2
+
+
+def test_unregister(create_bus, compensation_params):
+    bus = create_bus()
+    poller = MultiSensorPoller()
+    poller.register(bus, 0x76, compensation_params)
+    poller.register(bus, 0x77, compensation_params)
+    poller.unregister(bus, 0x76)
+    assert list(poller.poll()) == [(bus, 0x77)]
+
+    poller.unregister(bus, 0x77)
+    assert poller.poll() == {}
+
+
+def failing(error, failing_address, result=None):
+    def transaction(address, *args):
+        if address == failing_address:
+            raise error
+        return result
+    return transaction
+
+
+def test_poll_isolates_failing_sensors(create_bus, compensation_params):
+    nack = OSError(errno.EREMOTEIO, "Remote I/O error")
+    buses = [create_bus() for _ in range(2)]
+    buses[0].write_byte_data.side_effect = failing(nack, 0x76)
+    buses[1].read_i2c_block_data.side_effect = failing(nack, 0x77, list(range(8)))
+
+    with MultiSensorPoller() as poller:
+        for bus in buses:
+            poller.register(bus, 0x76, compensation_params)
+            poller.register(bus, 0x77, compensation_params)
+        readings = poller.poll()
+
+    assert list(readings) == [(bus, address) for bus in buses for address in (0x76, 0x77)]
+    assert readings[buses[0], 0x76] is None
+    assert readings[buses[1], 0x77] is None
+    assert readings[buses[0], 0x77].temperature == 0.0030482932925224304
+    assert readings[buses[1], 0x76].temperature == 0.0030482932925224304
+    assert poller.errors == {(buses[0], 0x76): nack, (buses[1], 0x77): nack}
+    buses[0].read_i2c_block_data.assert_called_once_with(0x77, 0xF7, 8)
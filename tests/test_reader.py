@@ -38,3 +38,10 @@ def test_signed_byte():
     read = reader(bus=smbus, address=0x76)
     assert read.signed_byte(register=0x19A) == 0xEE - 0x100
     smbus.read_byte_data.assert_called_with(0x76, 0x19A)
+
+
+def test_block():
+    smbus.read_i2c_block_data = MagicMock(return_value=[0xDE, 0xAD, 0xBE, 0xEF])
+    read = reader(bus=smbus, address=0x76)
+    assert read.block(register=0x88, length=4) == b"\xDE\xAD\xBE\xEF"
+    smbus.read_i2c_block_data.assert_called_with(0x76, 0x88, 4)
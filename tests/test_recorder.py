@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+from bme280.recorder import Recorder, Replay
+from bme280.simulator import CALIBRATION
+import bme280
+import pytest
+
+real_block = bytes([0x54, 0x2B, 0x00, 0x80, 0x46, 0x00, 0x6E, 0x8C])
+
+
+def record(path, compensation_params):
+    with Recorder(path, {0x76: compensation_params, 0x77: CALIBRATION}) as recorder:
+        recorder.record(0x76, bytes(range(8)), epoch=1000.0)
+        recorder.record(0x77, real_block, epoch=1000.5)
+        recorder.record(0x77, real_block, epoch=1001.0)
+
+
+def test_round_trip(tmp_path, compensation_params):
+    path = str(tmp_path / "log.bin")
+    record(path, compensation_params)
+
+    with Replay(path) as replay:
+        assert len(replay) == 3
+        assert replay.calibrations == {0x76: compensation_params, 0x77: CALIBRATION}
+        assert list(replay.records()) == [
+            (1000.0, 0x76, bytes(range(8))),
+            (1000.5, 0x77, real_block),
+            (1001.0, 0x77, real_block)
+        ]
+
+
+def test_replay_readings(tmp_path, compensation_params):
+    path = str(tmp_path / "log.bin")
+    record(path, compensation_params)
+
+    with Replay(path) as replay:
+        readings = list(replay.readings())
+
+    address, reading = readings[0]
+    assert address == 0x76
+    assert reading.epoch == 1000.0
+    assert reading.temperature == 0.0030482932925224304
+    assert reading.pressure == 8801790.518824806
+    assert reading.humidity == 0.02082886288568924
+
+    expected = bme280.compensate_float(bme280.uncompensated_readings(real_block), CALIBRATION)
+    assert readings[2][1].temperature == expected[0]
+    assert readings[2][1].humidity == expected[2]
+
+
+def test_append_to_existing(tmp_path, compensation_params):
+    path = str(tmp_path / "log.bin")
+    record(path, compensation_params)
+    record(path, compensation_params)
+
+    with Replay(path) as replay:
+        assert len(replay) == 6
+
+
+def test_append_with_different_calibration(tmp_path, compensation_params):
+    path = str(tmp_path / "log.bin")
+    record(path, compensation_params)
+
+    with pytest.raises(ValueError):
+        Recorder(path, {0x76: CALIBRATION})
+
+
+def test_record_partial_block(tmp_path):
+    with Recorder(str(tmp_path / "log.bin"), {0x76: CALIBRATION}) as recorder:
+        with pytest.raises(ValueError):
+            recorder.record(0x76, real_block[:5])
+
+
+def test_not_a_log(tmp_path):
+    path = tmp_path / "log.bin"
+    path.write_bytes(b"something else entirely")
+
+    with pytest.raises(ValueError):
+        Replay(str(path))
+
+
+def test_compensate_batch(tmp_path, compensation_params):
+    np = pytest.importorskip("numpy")
+    path = str(tmp_path / "log.bin")
+    record(path, compensation_params)
+
+    with Replay(path) as replay:
+        epochs, temperature, pressure, humidity = replay.compensate_batch(0x77)
+        expected = [reading for address, reading in replay.readings() if address == 0x77]
+
+    assert list(epochs) == [1000.5, 1001.0]
+    assert np.array_equal(temperature, [r.temperature for r in expected])
+    assert np.array_equal(pressure, [r.pressure for r in expected])
+    assert np.array_equal(humidity, [r.humidity for r in expected])
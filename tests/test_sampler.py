@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+from itertools import islice
+from unittest.mock import MagicMock, call
+from bme280.history import History
+from bme280.sampler import Sampler
+import bme280
+import pytest
+
+
+def test_start_configures_normal_mode(compensation_params, smbus):
+    sampler = Sampler(smbus, 0x77, compensation_params,
+                      sampling=bme280.oversampling.x2, standby=5, iir_filter=4)
+    sampler.start()
+    assert smbus.write_byte_data.call_args_list == [
+        call(0x77, 0xF4, 0x00),
+        call(0x77, 0xF5, 5 << 5 | 4 << 2),
+        call(0x77, 0xF2, 2),
+        call(0x77, 0xF4, 2 << 5 | 2 << 2 | 3)
+    ]
+
+
+def test_read_only_burst_reads(compensation_params, smbus):
+    sampler = Sampler(smbus, 0x76, compensation_params).start()
+    smbus.write_byte_data.reset_mock()
+
+    first = sampler.read()
+    second = sampler.read()
+
+    smbus.write_byte_data.assert_not_called()
+    assert smbus.read_i2c_block_data.call_args_list == [call(0x76, 0xF7, 8)] * 2
+    assert first.temperature == 0.0030482932925224304
+    assert second.pressure == 8801790.518824806
+
+
+def test_read_before_start(compensation_params, smbus):
+    with pytest.raises(RuntimeError):
+        Sampler(smbus, 0x76, compensation_params).read()
+
+
+def test_iterate_and_stop(compensation_params, smbus):
+    with Sampler(smbus, 0x76, compensation_params, standby=0) as sampler:
+        readings = list(islice(sampler, 3))
+
+    assert len(readings) == 3
+    assert smbus.read_i2c_block_data.call_count == 3
+    assert smbus.write_byte_data.call_args_list[-1] == call(0x76, 0xF4, 1 << 5 | 1 << 2)
+
+
+def test_period(compensation_params, smbus):
+    sampler = Sampler(smbus, 0x76, compensation_params, standby=5)
+    assert sampler.period == pytest.approx(1.0 + 0.000575 * 2 + 0.00125 + 0.0023 * 6)
+
+
+def test_invalid_filter(compensation_params, smbus):
+    with pytest.raises(ValueError):
+        Sampler(smbus, 0x76, compensation_params, iir_filter=7)
+
+
+def test_invalid_oversampling(compensation_params, smbus):
+    with pytest.raises(ValueError):
+        Sampler(smbus, 0x76, compensation_params, h_sampling=9)
+
+
+def test_per_channel_oversampling(compensation_params, smbus):
+    smbus.read_i2c_block_data = MagicMock(side_effect=lambda address, register, length: list(range(8))[:length])
+    sampler = Sampler(smbus, 0x76, compensation_params, h_sampling=bme280.oversampling.skip,
+                      p_sampling=bme280.oversampling.x4).start()
+    assert smbus.write_byte_data.call_args_list[-2:] == [
+        call(0x76, 0xF2, 0),
+        call(0x76, 0xF4, 1 << 5 | 3 << 2 | 3)
+    ]
+    reading = sampler.read()
+    assert reading.humidity is None
+    assert smbus.read_i2c_block_data.call_args_list == [call(0x76, 0xF7, 6)]
+
+
+def test_restart_after_stop(compensation_params, smbus):
+    sampler = Sampler(smbus, 0x76, compensation_params).start()
+    sampler.stop()
+    smbus.write_byte_data.reset_mock()
+
+    sampler.start()
+    assert smbus.write_byte_data.call_args_list == [call(0x76, 0xF4, 1 << 5 | 1 << 2 | 3)]
+
+
+def test_feeds_history(compensation_params, smbus):
+    history = History(2)
+    sampler = Sampler(smbus, 0x76, compensation_params, compact=True, history=history).start()
+    for _ in range(3):
+        sampler.read()
+
+    assert len(history) == 2
+    assert history.mean("pressure") == 8801790.518824806
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2021 Richard Hull
+# See LICENSE.rst for details.
+
+import time
+from bme280.sampler import Sampler
+from bme280.simulator import CALIBRATION, Environment, SimulatedBME280, SimulatedBus
+import bme280
+import pytest
+
+
+def simulated_bus(**kwargs):
+    return SimulatedBus({0x76: SimulatedBME280(environment=Environment(21.5, 987.6, 55.0))},
+                        realtime=False, **kwargs)
+
+
+def test_calibration_nvm():
+    bus = simulated_bus()
+    assert bme280.load_calibration_params(bus, 0x76) == CALIBRATION
+    assert bus.transactions == 2
+
+
+def test_calibration_nvm_by_register():
+    bus = simulated_bus(block_reads=False)
+    assert bme280.load_calibration_params(bus, 0x76) == CALIBRATION
+
+
+def test_chip_id():
+    assert simulated_bus().read_byte_data(0x76, 0xD0) == 0x60
+
+
+def test_no_device():
+    with pytest.raises(OSError):
+        simulated_bus().read_byte_data(0x77, 0xD0)
+
+
+def test_forced_sample():
+    bus = simulated_bus()
+    data = bme280.sample(bus, 0x76, CALIBRATION, sampling=bme280.oversampling.x16)
+    assert data.temperature == pytest.approx(21.5, abs=0.01)
+    assert data.pressure == pytest.approx(987.6, abs=0.01)
+    assert data.humidity == pytest.approx(55.0, abs=0.01)
+
+
+def test_skipped_channel():
+    bus = simulated_bus()
+    bme280.sample(bus, 0x76, CALIBRATION)
+    bme280.sample(bus, 0x76, CALIBRATION, h_sampling=bme280.oversampling.skip)
+    assert bus.read_i2c_block_data(0x76, 0xFD, 2) == [0x80, 0x00]
+
+
+def test_status_and_return_to_sleep():
+    bus = simulated_bus()
+    bus.write_byte_data(0x76, 0xF2, bme280.oversampling.x1)
+    bus.write_byte_data(0x76, 0xF4, 1 << 5 | 1 << 2 | bme280.FORCED_MODE)
+    assert bus.read_byte_data(0x76, 0xF3) & 0x08
+
+    time.sleep(0.01)
+    assert not bus.read_byte_data(0x76, 0xF3) & 0x08
+    assert bus.read_byte_data(0x76, 0xF4) & 0x03 == bme280.SLEEP_MODE
+
+
+def test_soft_reset():
+    bus = simulated_bus()
+    bus.write_byte_data(0x76, 0xF2, bme280.oversampling.x4)
+    bus.write_byte_data(0x76, 0xE0, 0xB6)
+    assert bus.read_byte_data(0x76, 0xF2) == 0
+    assert bus.read_byte_data(0x76, 0xF3) & 0x01
+    assert bme280.load_calibration_params(bus, 0x76) == CALIBRATION
+
+
+def test_normal_mode_sampler():
+    bus = simulated_bus()
+    with Sampler(bus, 0x76, standby=bme280.standby_time.ms_0_5) as sampler:
+        data = sampler.read()
+        assert bus.read_byte_data(0x76, 0xF4) & 0x03 == bme280.NORMAL_MODE
+
+        # Config writes are ignored in normal mode
+        bus.write_byte_data(0x76, 0xF5, 0xFF)
+        assert bus.read_byte_data(0x76, 0xF5) == 0
+
+    assert data.temperature == pytest.approx(21.5, abs=0.01)
+
+
+def test_bus_time():
+    bus = simulated_bus()
+    bus.write_byte_data(0x76, 0xF2, 1)
+    bus.read_i2c_block_data(0x76, 0xF7, 8)
+    assert bus.transactions == 2
+    assert bus.bytes_transferred == 3 + 11
+    assert bus.bus_time == pytest.approx(0.0002 + (29 + 101) / 100000.0)
+
+    bus.reset_stats()
+    assert bus.transactions == 0
+
+
+def test_noisy_environment():
+    environment = Environment(noise=0.5, seed=1)
+    readings = {environment(0) for _ in range(3)}
+    assert len(readings) == 3